@@ -0,0 +1,182 @@
+"""
+Benchmarks the overhead of `OptimizableFunction.fit` over hand-written calls to
+`scipy.optimize.minimize` for the same problems.
+
+Run with
+
+    python benchmarks/overhead.py --sizes 10 1000 100000 10000000
+
+Every problem is fitted with both approaches from the same initial values, and the
+ratio of the best wall times is reported. With `--max-ratio`, the script exits with a
+non-zero status if any ratio exceeds the given value, so that it can be used to catch
+regressions.
+"""
+import argparse
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from optimazing import OptimizableFunction
+
+
+def linear(x, *, a, b):
+    return a * x + b
+
+
+def exponential(x, *, a, tau):
+    return a * np.exp(-x / tau)
+
+
+def polynomial(x, *, c):
+    return np.polyval(c, x)
+
+
+def _raw_linear(x, p):
+    return p[0] * x + p[1]
+
+
+def _raw_exponential(x, p):
+    return p[0] * np.exp(-x / p[1])
+
+
+def _raw_chi_squared(y_true, y_est, weights, sigma):
+    return np.mean(weights * (y_true - y_est) ** 2 / sigma**2)
+
+
+def _raw_laplace(y_true, y_est, weights, sigma):
+    return np.mean(weights * np.abs(y_true - y_est) / sigma)
+
+
+def _raw_poisson(y_true, y_est, weights, sigma):
+    return np.mean(weights * (y_est - y_true * np.log(y_est + 1e-8)))
+
+
+def _problems(size: int, rnd: np.random.RandomState) -> dict:
+    """Returns pairs of callables (foptima fit, raw minimize) per problem."""
+    x = np.linspace(0.0, 1.0, size)
+    y_linear = 3.0 * x + 1.0 + rnd.randn(size) * 0.1
+    y_exp = 2.0 * np.exp(-x / 0.5) + rnd.randn(size) * 0.01
+    y_counts = rnd.poisson(10.0 * np.exp(-x / 0.5)).astype(float)
+    weights = rnd.rand(size)
+    sigma = rnd.rand(size) + 0.5
+    df = pd.DataFrame({"x": x, "y": y_linear, "w": weights, "s": sigma})
+
+    def raw(model, y, x0, loss=_raw_chi_squared, w=weights, s=sigma, **kwargs):
+        return lambda: minimize(lambda p: loss(y, model(x, p), w, s), x0, **kwargs)
+
+    opt_linear = OptimizableFunction(linear)
+    opt_exponential = OptimizableFunction(exponential)
+    opt_polynomial = OptimizableFunction(polynomial)
+    return {
+        "linear": (
+            lambda: opt_linear.fit(x, y_linear, weights=weights, sigma=sigma, a=0, b=0),
+            raw(_raw_linear, y_linear, [0.0, 0.0]),
+        ),
+        "exponential": (
+            lambda: opt_exponential.fit(
+                x, y_exp, weights=weights, sigma=sigma, a=1.0, tau=1.0
+            ),
+            raw(_raw_exponential, y_exp, [1.0, 1.0]),
+        ),
+        "array_parameter": (
+            lambda: opt_polynomial.fit(
+                x, y_linear, weights=weights, sigma=sigma, c=np.zeros(3)
+            ),
+            raw(lambda x, p: np.polyval(p, x), y_linear, np.zeros(3)),
+        ),
+        "bounded": (
+            lambda: opt_linear.bound(a=(0.0, 2.0)).fit(
+                x, y_linear, weights=weights, sigma=sigma, a=1.0, b=0.0
+            ),
+            raw(
+                _raw_linear,
+                y_linear,
+                [1.0, 0.0],
+                bounds=[(0.0, 2.0), (None, None)],
+            ),
+        ),
+        "frozen": (
+            lambda: opt_linear.freeze(b=1.0).fit(
+                x, y_linear, weights=weights, sigma=sigma, a=0.0
+            ),
+            raw(lambda x, p: p[0] * x + 1.0, y_linear, [0.0]),
+        ),
+        "dataframe": (
+            lambda: opt_linear.fit(df, "y", weights="w", sigma="s", a=0.0, b=0.0),
+            raw(_raw_linear, y_linear, [0.0, 0.0]),
+        ),
+        "laplace": (
+            lambda: opt_linear.fit(
+                x, y_linear, loss="laplace", weights=weights, sigma=sigma, a=0, b=0
+            ),
+            raw(_raw_linear, y_linear, [0.0, 0.0], loss=_raw_laplace),
+        ),
+        "poisson": (
+            lambda: opt_exponential.fit(
+                x, y_counts, loss="poisson", weights=weights, a=1.0, tau=1.0
+            ),
+            raw(
+                _raw_exponential,
+                y_counts,
+                [1.0, 1.0],
+                loss=_raw_poisson,
+                s=np.ones(size),
+            ),
+        ),
+    }
+
+
+def _best_time(func, repeat: int) -> float:
+    number = 1
+    while timeit.timeit(func, number=number) < 0.2 and number < 1000:
+        number *= 10
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 100000], help="data sizes"
+    )
+    parser.add_argument(
+        "--problems", nargs="+", default=None, help="subset of problems to run"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per timing")
+    parser.add_argument(
+        "--max-ratio", type=float, default=None, help="fail if a ratio exceeds this"
+    )
+    options = parser.parse_args(argv)
+
+    rows = []
+    for size in options.sizes:
+        problems = _problems(size, np.random.RandomState(0))
+        for name in options.problems or problems:
+            fit, raw = problems[name]
+            fit_time = _best_time(fit, options.repeat)
+            raw_time = _best_time(raw, options.repeat)
+            rows.append(
+                {
+                    "problem": name,
+                    "size": size,
+                    "fit [ms]": fit_time * 1e3,
+                    "minimize [ms]": raw_time * 1e3,
+                    "ratio": fit_time / raw_time,
+                }
+            )
+            print(
+                f"{name:>16} {size:>10}: {fit_time * 1e3:10.3f} ms vs "
+                f"{raw_time * 1e3:10.3f} ms, ratio {fit_time / raw_time:6.2f}",
+                file=sys.stderr,
+            )
+    table = pd.DataFrame(rows)
+    print(table.to_string(index=False, float_format="{:.3f}".format))
+
+    if options.max_ratio is not None and (table["ratio"] > options.max_ratio).any():
+        print(f"Overhead ratio exceeded {options.max_ratio}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
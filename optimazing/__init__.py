@@ -1,11 +1,18 @@
 from ._optimizable_function import OptimizableFunction, optimizable
-from ._optimization_result import OptimizationResult
+from ._optimization_result import OptimizationResult, OptimizationResults
+from ._incremental import IncrementalFit
+from ._stats import FitStats
+from ._trace import TraceRecorder
 from .losses import loss, _losses as losses
 
 __all__ = [
     "OptimizableFunction",
     "optimizable",
     "OptimizationResult",
+    "OptimizationResults",
+    "IncrementalFit",
+    "FitStats",
+    "TraceRecorder",
     "losses",
     "loss",
 ]
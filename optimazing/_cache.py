@@ -0,0 +1,53 @@
+"""
+Memoization of objective evaluations. Optimizers frequently evaluate the objective at
+the same point more than once (e.g. line search end points or the final function
+value), which is wasteful for expensive functions.
+"""
+from collections import OrderedDict
+from typing import Any, Callable
+import numpy as np
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value
+
+
+class EvaluationCache:
+    """Bounded least-recently-used cache for functions of a flat parameter vector,
+    keyed on the bytes of the vector.
+
+    Parameters
+    ----------
+    maxsize: int
+        Maximum number of cached evaluations.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def wrap(self, function: Callable) -> Callable:
+        """Returns `function` with its evaluations cached. Cached arrays are copied on
+        the way out, so that callers cannot modify them."""
+        data = self._data
+
+        def _cached(p):
+            key = np.asarray(p, dtype=float).tobytes()
+            if key in data:
+                self.hits += 1
+                data.move_to_end(key)
+                return _copy(data[key])
+            self.misses += 1
+            value = function(p)
+            data[key] = _copy(value)
+            if len(data) > self.maxsize:
+                data.popitem(last=False)
+            return value
+
+        return _cached
@@ -0,0 +1,151 @@
+"""
+Incremental chi squared fits of functions that are linear in all of their free
+parameters. Every batch of data is reduced to the weighted normal equations
+X^T W X and X^T W y (plus y^T W y for the function value), so that the batch can be
+discarded and the current solution only costs a k x k solve, independent of how much
+data has been seen.
+"""
+import numpy as np
+from typing import Any, TYPE_CHECKING
+from scipy.optimize import OptimizeResult
+from ._optimization_result import OptimizationResult
+from ._parameters import Parameters
+
+if TYPE_CHECKING:
+    from ._optimizable_function import OptimizableFunction
+
+
+class IncrementalFit:
+    """Chi squared fit of a function that is linear in its free parameters, updated
+    batch by batch from sufficient statistics.
+
+    Created by `OptimizableFunction.fit_incremental`. With a forgetting factor below
+    one, the statistics of earlier batches are scaled down by that factor with every
+    new batch, so that the fit tracks parameters that drift over time.
+
+    Attributes
+    ----------
+    forgetting: float
+        Factor in (0, 1] applied to the statistics of all earlier batches.
+    num_batches: int
+        Number of batches added so far.
+    num_points: float
+        Effective number of data points, i.e. the number of points of all batches
+        discounted by the forgetting factor.
+    """
+
+    def __init__(
+        self,
+        optimizable_function: "OptimizableFunction",
+        parameters: Parameters,
+        forgetting: float = 1.0,
+    ):
+        if not 0.0 < forgetting <= 1.0:
+            raise ValueError(
+                f"Forgetting factor has to be in (0, 1], but found {forgetting}."
+            )
+        self._optfun = optimizable_function
+        self._parameters = parameters
+        self.forgetting = forgetting
+        self.num_batches = 0
+        self.num_points = 0.0
+        self._xtwx = np.zeros((parameters.size, parameters.size))
+        self._xtwy = np.zeros(parameters.size)
+        self._ytwy = 0.0
+
+    def update(
+        self,
+        args_or_df: Any,
+        target: Any = None,
+        weights: Any = None,
+        sigma: Any = None,
+    ) -> "IncrementalFit":
+        """Adds a batch of data to the fit.
+
+        Parameters
+        ----------
+        args_or_df, target, weights, sigma:
+            The batch, as for `OptimizableFunction.fit`.
+
+        Returns
+        -------
+        IncrementalFit
+            The fit itself, so that updates can be chained.
+        """
+        optfun = self._optfun
+        args_or_df, target, weights, sigma = optfun._load_inputs(
+            args_or_df, target, weights, sigma
+        )
+        args = optfun._check_inputs(args_or_df, target)
+        target, weights, sigma = optfun._prepare_inputs(
+            args_or_df, target, weights, sigma
+        )
+        params = dict(optfun._freeze_dict)
+        offset, design = optfun._linear_design(self._parameters, args, params)
+        target = np.asarray(target, dtype=float)
+        inverse_variance = np.broadcast_to(
+            np.asarray(weights, dtype=float) / np.asarray(sigma, dtype=float) ** 2,
+            target.shape,
+        ).ravel()
+        residual = (target - offset).ravel()
+        flat_design = design.reshape(-1, self._parameters.size)
+        weighted_design = flat_design * inverse_variance[:, None]
+        if self.num_batches == 0:
+            # Checked at the solution of the first batch only, as every further check
+            # would cost another evaluation of the function.
+            coefficients = np.linalg.lstsq(
+                weighted_design.T @ flat_design,
+                weighted_design.T @ residual,
+                rcond=None,
+            )[0]
+            optfun._check_linear(
+                self._parameters, args, params, offset, design, coefficients
+            )
+
+        self._xtwx *= self.forgetting
+        self._xtwx += weighted_design.T @ flat_design
+        self._xtwy *= self.forgetting
+        self._xtwy += weighted_design.T @ residual
+        self._ytwy = self.forgetting * self._ytwy + residual @ (
+            inverse_variance * residual
+        )
+        self.num_points = self.forgetting * self.num_points + residual.size
+        self.num_batches += 1
+        return self
+
+    @property
+    def result(self) -> OptimizationResult:
+        """Solution of the normal equations of all batches so far."""
+        if self.num_batches == 0:
+            raise ValueError("No data has been added to the incremental fit yet.")
+        xtwx_inv = np.linalg.pinv(self._xtwx, hermitian=True)
+        coefficients = xtwx_inv @ self._xtwy
+        chi2 = self._ytwy - coefficients @ self._xtwy
+        result = OptimizeResult(
+            x=coefficients,
+            success=True,
+            status=0,
+            message="Solved normal equations of all batches.",
+            nit=0,
+            nfev=0,
+            hess_inv=0.5 * self.num_points * xtwx_inv,
+            covariance=xtwx_inv,
+        )
+        values, uncertainties = self._optfun._extract_results(self._parameters, result)
+        return OptimizationResult(
+            self._optfun._function,
+            values,
+            max(chi2, 0.0) / self.num_points,
+            result,
+            uncertainties,
+            covariance=xtwx_inv,
+            parameters=self._parameters,
+            gradient=self._optfun._gradient,
+            vectorized=self._optfun._vectorized,
+        )
+
+    def __repr__(self):
+        return (
+            f"<IncrementalFit {self._optfun._name}: {self.num_batches} batches, "
+            f"forgetting={self.forgetting}>"
+        )
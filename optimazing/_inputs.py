@@ -0,0 +1,45 @@
+"""
+Inputs that live on disk. Arrays in .npy files are memory-mapped read-only, and Parquet
+files and Arrow tables are converted to DataFrames that share memory with the Arrow
+buffers where possible, so that large inputs are not copied into memory before a fit.
+Parquet and Arrow support requires the optional dependency pyarrow.
+"""
+import os
+import numpy as np
+import pandas as pd
+from typing import Any, List, Optional
+
+
+def _is_path(value: Any, suffix: str) -> bool:
+    return isinstance(value, (str, os.PathLike)) and os.fspath(value).endswith(suffix)
+
+
+def is_table(value: Any) -> bool:
+    """Whether `value` is a Parquet file or an Arrow table."""
+    return _is_path(value, ".parquet") or (
+        hasattr(value, "column_names") and hasattr(value, "to_pandas")
+    )
+
+
+def load_table(value: Any, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Reads `columns` of a Parquet file (memory-mapped) or an Arrow table into a
+    DataFrame. Numeric columns without missing values are not copied."""
+    if _is_path(value, ".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow.")
+        value = pq.read_table(value, columns=columns, memory_map=True)
+    elif columns is not None:
+        value = value.select([c for c in columns if c in value.column_names])
+    return value.to_pandas(split_blocks=True)
+
+
+def load_array(value: Any) -> Any:
+    """Memory-maps `value` read-only if it is the path of a .npy file, also for the
+    items of a list or tuple, and returns everything else unchanged."""
+    if _is_path(value, ".npy"):
+        return np.load(value, mmap_mode="r")
+    if isinstance(value, (list, tuple)) and any(_is_path(v, ".npy") for v in value):
+        return [load_array(v) for v in value]
+    return value
@@ -0,0 +1,83 @@
+"""
+Starting points and deduplication of minima for multi-start fits. Starting points are
+spread over the box given by the bounds of every parameter, and for parameters without
+(finite) bounds over an interval around the initial value.
+"""
+import numpy as np
+from typing import List, Optional
+from scipy.stats import qmc
+
+SAMPLINGS = ["sobol", "lhs"]
+
+
+def sample_starts(
+    x0: np.ndarray,
+    n_starts: int,
+    lower: Optional[np.ndarray] = None,
+    upper: Optional[np.ndarray] = None,
+    sampling: str = "sobol",
+    spread: float = 1.0,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """Samples starting points, the first of which is `x0` itself.
+
+    Parameters
+    ----------
+    x0: np.ndarray
+        Initial flat parameters of length k.
+    n_starts: int
+        Number of starting points.
+    lower, upper: np.ndarray, optional
+        Bounds of every coordinate, infinite where open.
+    sampling: str
+        "sobol" for a scrambled Sobol sequence or "lhs" for a Latin hypercube.
+    spread: float
+        Coordinates with an open bound are sampled from
+        `x0 +- spread * max(1, |x0|)`, clipped to the other bound.
+    seed: int, optional
+        Seed of the scrambling.
+
+    Returns
+    -------
+    np.ndarray
+        Starting points of shape (n_starts, k).
+    """
+    if sampling not in SAMPLINGS:
+        raise ValueError(
+            f"Unknown sampling '{sampling}', has to be one of {SAMPLINGS}."
+        )
+    x0 = np.asarray(x0, dtype=float)
+    k = len(x0)
+    lower = np.full(k, -np.inf) if lower is None else np.asarray(lower, dtype=float)
+    upper = np.full(k, np.inf) if upper is None else np.asarray(upper, dtype=float)
+
+    n_samples = n_starts - 1
+    if sampling == "sobol":
+        # Sobol sequences are balanced for powers of two only.
+        n_draw = 1 << max(n_samples - 1, 0).bit_length()
+        unit = qmc.Sobol(k, seed=seed).random(n_draw)[:n_samples]
+    else:
+        unit = qmc.LatinHypercube(k, seed=seed).random(n_samples)
+
+    width = spread * np.maximum(1.0, np.abs(x0))
+    bounded = np.isfinite(lower) & np.isfinite(upper)
+    low = np.where(bounded, lower, np.maximum(x0 - width, lower))
+    high = np.where(bounded, upper, np.minimum(x0 + width, upper))
+    return np.vstack([x0, low + unit * (high - low)])
+
+
+def distinct_minima(
+    xs: List[np.ndarray], function_values: np.ndarray, rtol: float = 1e-4
+) -> List[int]:
+    """Indices of distinct minima, sorted by function value. A minimum is a duplicate
+    of a better one if all of its coordinates agree within `rtol` (relative to
+    `max(1, |x|)`)."""
+    order = np.argsort(function_values, kind="stable")
+    distinct = []
+    for i in order:
+        if not any(
+            np.all(np.abs(xs[i] - xs[j]) <= rtol * np.maximum(1.0, np.abs(xs[j])))
+            for j in distinct
+        ):
+            distinct.append(i)
+    return distinct
@@ -1,11 +1,26 @@
-from typing import Callable, Optional, Dict, Any, Union, Tuple, Iterable
-from inspect import getfullargspec
+from typing import Callable, Optional, Dict, Any, Union, Tuple, Iterable, List
+from inspect import getfullargspec, signature
+from functools import partial
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
-from ._optimization_result import OptimizationResult
-from .losses import _losses, BaseLoss
+from scipy.optimize import minimize, least_squares, OptimizeResult
+from ._optimization_result import (
+    OptimizationResult,
+    OptimizationResults,
+    ParameterValue,
+)
+from .losses import _losses, BaseLoss, chi_squared
 from ._parameters import Parameters
+from ._parallel import fit_in_pool, fit_starts_in_pool, fit_resamples_in_pool
+from ._stacked import levenberg_marquardt
+from ._cache import EvaluationCache
+from ._uncertainties import numerical_hessian, inverse_hessian
+from ._stochastic import stochastic_minimize, forward_difference_gradient
+from ._inputs import is_table, load_table, load_array
+from ._multistart import sample_starts, distinct_minima
+from ._incremental import IncrementalFit
+from ._stats import FitStats
+from ._trace import iteration_callback
 
 
 FORBIDDEN_PARAM_NAMES = [
@@ -15,11 +30,62 @@ FORBIDDEN_PARAM_NAMES = [
     "y",
     "args",
     "options",
+    "solver",
+    "cache_size",
+    "uncertainty",
+    "chunk_size",
+    "callback",
+    "callback_every",
 ]
 
+UNCERTAINTY_METHODS = ["auto", "optimizer", "hessian", "jacobian"]
+
+
+def optimizable(
+    function: Optional[Callable] = None,
+    *,
+    gradient: Optional[Callable] = None,
+    linear: Optional[List[str]] = None,
+    vectorized: bool = False,
+):
+    """Decorator that turns any function into an optimizable function.
+
+    Parameters
+    ----------
+    function: callable
+        Function with parameters as keyword-only arguments.
+    gradient: callable, optional
+        Function with the same signature as `function` that returns a dictionary
+        mapping each parameter to the derivative of the function output with respect
+        to that parameter. For a parameter of shape `s` the derivative has to be
+        broadcastable to shape `s + output.shape`.
+    linear: list(str), optional
+        Parameters the function output depends on linearly. For chi squared fits,
+        these are solved for in closed form at every step of the optimizer, so that
+        only the remaining parameters are optimized numerically.
+    vectorized: bool
+        Whether the function broadcasts over a leading axis of its parameters, i.e.
+        returns outputs of shape (M, n) if every scalar parameter is an array of shape
+        (M, 1). Numerical hessians are then evaluated in a single call.
+
+    Example
+    -------
+    >>> def linear_gradient(x, *, a, b):
+    ...     return {"a": x, "b": 1.0}
+    ...
+    ... @optimizable(gradient=linear_gradient)
+    ... def linear(x, *, a, b):
+    ...     return a * x + b
+    ...
+    ... @optimizable(linear=["a", "b"])
+    ... def exponential(x, *, a, b, tau):
+    ...     return a * np.exp(-x / tau) + b
+    """
+    if function is None:
+        return partial(
+            optimizable, gradient=gradient, linear=linear, vectorized=vectorized
+        )
 
-def optimizable(function):
-    """Decorator that turns any function into an optimizable function."""
     argspecs = getfullargspec(function)
     num_args = len(argspecs.args)
     num_params = len(argspecs.kwonlyargs)
@@ -44,7 +110,9 @@ def optimizable(function):
             " ...)"
         )
 
-    return OptimizableFunction(function)
+    return OptimizableFunction(
+        function, gradient=gradient, linear=linear, vectorized=vectorized
+    )
 
 
 class OptimizableFunction:
@@ -59,6 +127,14 @@ class OptimizableFunction:
     bounds: dict(str, tuple(float, float))
         Dictionary that maps bounded parameters to its bounds. A `None` bound is
         open.
+    gradient: callable, optional
+        Function with the same signature as `function` that returns a dictionary
+        mapping parameters to the derivative of the function output with respect to
+        them.
+    linear: list(str), optional
+        Parameters the function output depends on linearly.
+    vectorized: bool
+        Whether the function broadcasts over a leading axis of its parameters.
     """
 
     def __init__(
@@ -66,8 +142,14 @@ class OptimizableFunction:
         function: Callable,
         freeze_dict: Optional[Dict[str, Any]] = None,
         bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        gradient: Optional[Callable] = None,
+        linear: Optional[List[str]] = None,
+        vectorized: bool = False,
     ):
         self._function = function
+        self._gradient = gradient
+        self._linear = list(linear or [])
+        self._vectorized = vectorized
         self._freeze_dict = freeze_dict or {}
         self._bounds_dict = bounds or {}
         argspecs = getfullargspec(function)
@@ -76,6 +158,9 @@ class OptimizableFunction:
         self._parameters = argspecs.kwonlyargs
         self._name = function.__name__
         self.__doc__ = self._function.__doc__
+        for p in self._linear:
+            if p not in self._parameters:
+                raise ValueError(f"Linear parameter {p} unknown.")
 
     def _check_param_and_arg_names(self, params, args):
         for a in args:
@@ -107,6 +192,14 @@ class OptimizableFunction:
     def is_frozen(self) -> bool:
         return len(self._freeze_dict) > 0
 
+    @property
+    def has_gradient(self) -> bool:
+        return self._gradient is not None
+
+    @property
+    def is_partially_linear(self) -> bool:
+        return len(self._linear) > 0
+
     def _check_parameters(self, kwargs):
         for key in kwargs.keys():
             if key not in self._parameters:
@@ -142,7 +235,12 @@ class OptimizableFunction:
         """
         self._check_parameters(kwargs)
         return OptimizableFunction(
-            self._function, {**self._freeze_dict, **kwargs}, self._bounds_dict
+            self._function,
+            {**self._freeze_dict, **kwargs},
+            self._bounds_dict,
+            self._gradient,
+            self._linear,
+            self._vectorized,
         )
 
     def bound(self, **kwargs):
@@ -169,7 +267,12 @@ class OptimizableFunction:
         """
         self._check_parameters(kwargs)
         return OptimizableFunction(
-            self._function, self._freeze_dict, {**self._bounds_dict, **kwargs}
+            self._function,
+            self._freeze_dict,
+            {**self._bounds_dict, **kwargs},
+            self._gradient,
+            self._linear,
+            self._vectorized,
         )
 
     def fit(
@@ -181,6 +284,12 @@ class OptimizableFunction:
         sigma: Optional[Union[Iterable[float], str]] = None,
         options: Dict[str, Any] = None,
         verbose: bool = False,
+        solver: str = "minimize",
+        cache_size: int = 0,
+        uncertainty: str = "auto",
+        chunk_size: Optional[int] = None,
+        callback: Optional[Callable] = None,
+        callback_every: int = 1,
         **init_params,
     ) -> OptimizationResult:
         """Fits all free parameters of an optimizable function.
@@ -207,15 +316,65 @@ class OptimizableFunction:
             * "l1"
             * ...
         options: dict
-            Additional options. Will be propagated to scipy.optimize.minimize
+            Additional options. Will be propagated to scipy.optimize.minimize (or
+            scipy.optimize.least_squares, depending on `solver`). If both the
+            function and the loss provide a gradient and no `jac` is given here, the
+            exact jacobian is passed to the optimizer.
         verbose: bool
             Whether to print additional information during the fit.
+        solver: str
+            Either "minimize", which minimizes the loss as a generic scalar function,
+            or "least_squares", which is only available for the chi_squared loss and
+            minimizes the residuals `sqrt(weights) * (y_true - y_est) / sigma` with a
+            trust-region solver. The latter typically needs considerably fewer
+            function evaluations. For functions that are linear in all free
+            parameters, "linear" solves the chi_squared fit in closed form and raises
+            a ValueError if the function turns out not to be linear.
+        cache_size: int
+            Number of function evaluations to cache. Optimizers regularly evaluate
+            the same parameters more than once, which a cache avoids for expensive
+            functions. Disabled by default.
+        uncertainty: str
+            How the inverse hessian of the loss at the optimum is estimated, from which
+            the covariance of the parameters (`likelihood_factor / N` times the
+            inverse hessian for N data points, see `optimazing.losses`) and their
+            uncertainties (the square roots of its diagonal) follow:
+            * "optimizer": from the inverse hessian reported by the optimizer, which
+              only BFGS, least_squares and the linear solver provide.
+            * "hessian": from a central difference hessian of the loss.
+            * "jacobian": from the jacobian of the residuals, only available for the
+              chi_squared loss.
+            * "auto" (default): "optimizer" if the optimizer provides an inverse
+              hessian (which bounded fits and methods like Nelder-Mead do not),
+              otherwise "jacobian" for chi_squared and "hessian" for other losses.
+        chunk_size: int, optional
+            If given, the function and the loss are evaluated on blocks of this many
+            data points at a time and the loss is accumulated, which bounds the
+            memory needed for the function output and the temporaries of the loss.
+            Requires a loss that is a mean over data points, like all built-in
+            losses, and the "minimize" solver without linear parameters. The
+            uncertainty estimates "jacobian" and "hessian" are chunked as well.
+        callback: callable, optional
+            Called as `callback(params, loss, elapsed)` with a dictionary of the free
+            parameters, the loss and the seconds since the solver started, for every
+            iterate the solver accepts. Finite difference probes and trial points of
+            line searches are not reported. With linear parameters, only the
+            remaining parameters are passed. If all free parameters are linear (or
+            with the "linear" solver), it is called once with the closed form
+            solution, regardless of `callback_every`. Unlike `verbose`, this neither
+            prints nor slows down the evaluations. See `optimazing.TraceRecorder` for
+            a callback that records the optimization path. Not supported by the "lm"
+            method of the least_squares solver.
+        callback_every: int
+            Only every `callback_every`-th iterate is passed to `callback`.
         init_params: dict
             Initial values for fit.
 
         Returns
         -------
         OptimizationResult
+            With evaluation counters and timings of every stage of the fit in its
+            `stats` attribute, see `optimazing.FitStats`.
 
         Example
         -------
@@ -226,39 +385,1691 @@ class OptimizableFunction:
         ...
         ... linear.fit([0, 1, 2], [0.123, 0.938, 2.123], m=1, b=0)
         """
+        stats = FitStats()
+        with stats.stage("prepare"):
+            args_or_df, target, weights, sigma = self._load_inputs(
+                args_or_df, target, weights, sigma
+            )
+            args = self._check_inputs(args_or_df, target)
+            target, weights, sigma = self._prepare_inputs(
+                args_or_df, target, weights, sigma
+            )
+        with stats.stage("setup"):
+            setup = self._setup_fit(
+                loss,
+                options,
+                verbose,
+                solver,
+                init_params,
+                cache_size=cache_size,
+                uncertainty=uncertainty,
+                chunk_size=chunk_size,
+                callback=callback,
+                callback_every=callback_every,
+            )
+        return self._make_result(
+            setup, *self._fit_prepared(setup, args, target, weights, sigma, stats)
+        )
+
+    def fit_multistart(
+        self,
+        args_or_df: Union[Iterable[Iterable[float]], Iterable[float], pd.DataFrame],
+        target: Union[Iterable[float], str] = None,
+        loss: Union[str, Callable] = "chi_squared",
+        weights: Optional[Union[Iterable[float], str]] = None,
+        sigma: Optional[Union[Iterable[float], str]] = None,
+        options: Dict[str, Any] = None,
+        verbose: bool = False,
+        solver: str = "minimize",
+        n_starts: int = 16,
+        sampling: str = "sobol",
+        spread: float = 1.0,
+        seed: Optional[int] = None,
+        n_jobs: Optional[int] = 1,
+        chunksize: int = 1,
+        **init_params,
+    ) -> OptimizationResult:
+        """Fits all free parameters of an optimizable function from many starting
+        points and returns the best minimum.
+
+        Starting points are sampled within the bounds of every parameter, and around
+        the initial value for parameters without bounds. The first starting point is
+        the initial value itself. Minima that the optimizer did not converge to are
+        discarded (unless no fit converged), and minima that agree in all parameters
+        are counted once.
+
+        Parameters
+        ----------
+        args_or_df, target, loss, weights, sigma, options, verbose, solver
+            See `fit`.
+        n_starts: int
+            Number of starting points.
+        sampling: str
+            "sobol" for a scrambled Sobol sequence or "lhs" for a Latin hypercube.
+        spread: float
+            Parameters without bounds are sampled within
+            `init +- spread * max(1, |init|)`.
+        seed: int, optional
+            Seed for the sampling of the starting points.
+        n_jobs: int, optional
+            Number of worker processes, see `fit_many`. The data is sent to every
+            worker once.
+        chunksize: int
+            Number of starting points that are sent to a worker process at once.
+        init_params: dict
+            Initial values for fit.
+
+        Returns
+        -------
+        OptimizationResult
+            The result with the lowest loss. Its attribute `ensemble` holds all
+            distinct minima as `OptimizationResults`, sorted by loss.
+
+        Example
+        -------
+        >>> @optimizable
+        ... def wave(x, *, a, omega):
+        ...     return a * np.sin(omega * x)
+        ...
+        ... result = wave.bound(omega=(0.1, 10.0)).fit_multistart(x, y, a=1, omega=1)
+        ... result.ensemble.omega.value
+        """
+        self._check_keyword_collisions(self.fit_multistart)
+        args_or_df, target, weights, sigma = self._load_inputs(
+            args_or_df, target, weights, sigma
+        )
+        args = self._check_inputs(args_or_df, target)
+        data = (args,) + tuple(self._prepare_inputs(args_or_df, target, weights, sigma))
+        setup = self._setup_fit(loss, options, verbose, solver, init_params)
+        if setup.opt_config is None:
+            raise ValueError(
+                "A multi-start fit needs at least one parameter that is not linear."
+            )
+
+        lower = upper = None
+        if "bounds" in setup.opt_config:
+            lower, upper = np.array(setup.opt_config["bounds"], dtype=float).T
+            lower = np.where(np.isnan(lower), -np.inf, lower)
+            upper = np.where(np.isnan(upper), np.inf, upper)
+        starts = sample_starts(
+            setup.opt_config["x0"], n_starts, lower, upper, sampling, spread, seed
+        )
+        if n_jobs == 1:
+            columns = [self._fit_prepared(setup.with_start(x0), *data) for x0 in starts]
+        else:
+            columns = fit_starts_in_pool(self, setup, data, starts, n_jobs, chunksize)
+
+        converged = [c for c in columns if getattr(c[3], "success", True)] or columns
+        distinct = distinct_minima(
+            [c[3].x for c in converged], np.array([c[2] for c in converged])
+        )
+        columns = [converged[i] for i in distinct]
+        best = self._make_result(setup, *columns[0])
+        best.ensemble = self._collect_results(setup, columns)
+        return best
+
+    def fit_many(
+        self,
+        datasets: Iterable[Union[tuple, pd.DataFrame]],
+        loss: Union[str, Callable] = "chi_squared",
+        options: Dict[str, Any] = None,
+        verbose: bool = False,
+        solver: str = "minimize",
+        n_jobs: Optional[int] = 1,
+        chunksize: int = 1,
+        cache_size: int = 0,
+        uncertainty: str = "auto",
+        chunk_size: Optional[int] = None,
+        **init_params,
+    ) -> OptimizationResults:
+        """Fits all free parameters of an optimizable function to many independent
+        datasets.
+
+        The parameter layout, the loss and the optimizer configuration are set up only
+        once, so this is considerably faster than calling `fit` in a loop for many
+        small datasets.
+
+        Parameters
+        ----------
+        datasets: iterable
+            Iterable over datasets. Each dataset is either a DataFrame or a tuple
+            `(args_or_df, target, weights, sigma)` as they would be passed to `fit`,
+            where `weights` and `sigma` (and `target` for DataFrames) can be omitted.
+        loss: string or callable
+            Loss function, see `fit`.
+        options: dict
+            Additional options, see `fit`.
+        verbose: bool
+            Whether to print additional information during the fit.
+        solver: str
+            Solver to use, see `fit`.
+        n_jobs: int, optional
+            Number of worker processes. If 1, the datasets are fitted in the current
+            process; if None, one process per CPU is used. The function and the loss
+            are sent to every worker once, so both have to be picklable, i.e. defined
+            at module level.
+        chunksize: int
+            Number of datasets that are sent to a worker process at once. Larger
+            chunks reduce communication overhead for many small datasets.
+        cache_size: int
+            Number of function evaluations to cache per fit, see `fit`.
+        uncertainty: str
+            How parameter uncertainties are estimated, see `fit`.
+        chunk_size: int, optional
+            Number of data points the loss is evaluated on at a time, see `fit`.
+        init_params: dict
+            Initial values for all fits.
+
+        Returns
+        -------
+        OptimizationResults
+
+        Example
+        -------
+        >>> @optimizable
+        ... linear(x, *, a, b):
+        ...     return a * x + b
+        ...
+        ... results = linear.fit_many([(x1, y1), (x2, y2)], a=1, b=0)
+        ... results.a.value
+        """
+        self._check_keyword_collisions(self.fit_many)
+        setup = self._setup_fit(
+            loss,
+            options,
+            verbose,
+            solver,
+            init_params,
+            cache_size=cache_size,
+            uncertainty=uncertainty,
+            chunk_size=chunk_size,
+        )
+        if n_jobs == 1:
+            columns = [self._fit_dataset(setup, dataset) for dataset in datasets]
+        else:
+            columns = fit_in_pool(self, setup, datasets, n_jobs, chunksize)
+        return self._collect_results(setup, columns)
+
+    def fit_groups(
+        self,
+        df: pd.DataFrame,
+        by: Union[str, List[str]],
+        target: Optional[str] = None,
+        loss: Union[str, Callable] = "chi_squared",
+        weights: Optional[str] = None,
+        sigma: Optional[str] = None,
+        options: Dict[str, Any] = None,
+        verbose: bool = False,
+        solver: str = "minimize",
+        n_jobs: Optional[int] = 1,
+        chunksize: int = 1,
+        cache_size: int = 0,
+        uncertainty: str = "auto",
+        chunk_size: Optional[int] = None,
+        **init_params,
+    ) -> pd.DataFrame:
+        """Fits all free parameters of an optimizable function to every group of a
+        DataFrame.
+
+        Instead of slicing the DataFrame group by group, the relevant columns are
+        sorted by group once and every group is fitted on views into those columns.
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            DataFrame with columns named according to the function definition.
+        by: str or list(str)
+            Column(s) to group by.
+        target: str, optional
+            Name of the target column. Defaults to the name of the function.
+        loss: string or callable
+            Loss function, see `fit`.
+        weights: str, optional
+            Name of the weights column.
+        sigma: str, optional
+            Name of the uncertainties column.
+        options: dict
+            Additional options, see `fit`.
+        verbose: bool
+            Whether to print additional information during the fit.
+        solver: str
+            Solver to use, see `fit`.
+        n_jobs: int, optional
+            Number of worker processes, see `fit_many`.
+        chunksize: int
+            Number of groups that are sent to a worker process at once.
+        cache_size: int
+            Number of function evaluations to cache per fit, see `fit`.
+        uncertainty: str
+            How parameter uncertainties are estimated, see `fit`.
+        chunk_size: int, optional
+            Number of data points the loss is evaluated on at a time, see `fit`.
+        init_params: dict
+            Initial values for all fits.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per group, indexed by the group keys, with columns for the
+            parameter values, their uncertainties, the loss value and whether the fit
+            converged, see `OptimizationResults.to_frame`.
+
+        Example
+        -------
+        >>> @optimizable
+        ... linear(x, *, a, b):
+        ...     return a * x + b
+        ...
+        ... linear.fit_groups(df, by="channel", target="y", a=1, b=0)
+        """
+        self._check_keyword_collisions(self.fit_groups)
+        columns = {"target": target or self._function.__name__}
+        columns.update(weights=weights, sigma=sigma)
+        for arg in self._arguments:
+            if arg not in df.columns:
+                raise KeyError(
+                    f"Argument {arg} as specified in function was not found in "
+                    f"DataFrame, which has columns {df.columns}"
+                )
+        for name, column in columns.items():
+            if column is not None and column not in df.columns:
+                raise KeyError(
+                    f"{name.capitalize()} {column} not found in DataFrame that was "
+                    "passed."
+                )
+
+        grouper = df.groupby(by, sort=True)
+        # Rows with a missing key belong to no group, they are marked by NaN codes.
+        codes = grouper.ngroup().to_numpy(dtype=float)
+        rows = np.flatnonzero(~np.isnan(codes) & (codes >= 0))
+        codes = codes[rows].astype(int)
+        order = rows[np.argsort(codes, kind="stable")]
+        bounds = np.cumsum(np.bincount(codes, minlength=grouper.ngroups))
+        args = [df[a].to_numpy()[order] for a in self._arguments]
+        data = {
+            name: None if column is None else df[column].to_numpy()[order]
+            for name, column in columns.items()
+        }
+
+        def _datasets():
+            start = 0
+            for stop in bounds:
+                group = slice(start, stop)
+                yield ([a[group] for a in args],) + tuple(
+                    v if v is None else v[group]
+                    for v in [data["target"], data["weights"], data["sigma"]]
+                )
+                start = stop
+
+        results = self.fit_many(
+            _datasets(),
+            loss=loss,
+            options=options,
+            verbose=verbose,
+            solver=solver,
+            n_jobs=n_jobs,
+            chunksize=chunksize,
+            cache_size=cache_size,
+            uncertainty=uncertainty,
+            chunk_size=chunk_size,
+            **init_params,
+        )
+        return results.to_frame(index=grouper.size().index)
+
+    def fit_stacked(
+        self,
+        args: Union[Iterable[Iterable[float]], Iterable[float]],
+        target: Iterable[Iterable[float]],
+        weights: Optional[Iterable[Iterable[float]]] = None,
+        sigma: Optional[Iterable[Iterable[float]]] = None,
+        options: Dict[str, Any] = None,
+        verbose: bool = False,
+        **init_params,
+    ) -> OptimizationResults:
+        """Fits all free parameters of an optimizable function to many equally sized
+        datasets at once by minimizing the chi squared loss of every dataset.
+
+        All datasets are stacked and evaluated in a single call of the function, in
+        which every scalar parameter is an array of shape (N, 1) and every parameter
+        of shape `s` is an array of shape `(N,) + s`. The function therefore has to
+        broadcast over the leading dataset axis. The independent problems are solved
+        simultaneously with a batched Levenberg-Marquardt solver. For small models
+        this is much faster than running one optimizer per dataset.
+
+        Parameters
+        ----------
+        args: iterable(iterable(float)) or iterable(iterable(iterable(float)))
+            x-values of shape (N, n), or (num_args, N, n) for multiple inputs.
+        target: iterable(iterable(float))
+            Target values of shape (N, n).
+        weights: iterable(iterable(float)), optional
+            Weights of shape (N, n).
+        sigma: iterable(iterable(float)), optional
+            Uncertainties of shape (N, n).
+        options: dict
+            Options for the solver: `maxiter`, `ftol` and `xtol`.
+        verbose: bool
+            Whether to print additional information during the fit.
+        init_params: dict
+            Initial values, shared by all datasets.
+
+        Returns
+        -------
+        OptimizationResults
+
+        Example
+        -------
+        >>> @optimizable
+        ... linear(x, *, a, b):
+        ...     return a * x + b
+        ...
+        ... linear.fit_stacked(np.tile(x, (1000, 1)), y, a=1, b=0)
+        """
+        if self.is_bounded:
+            raise ValueError("Bounded parameters are not supported by fit_stacked.")
+        target = np.asarray(target, dtype=float)
+        if target.ndim != 2:
+            raise ValueError(
+                f"Target has to be of shape (N, n), but found shape {target.shape}."
+            )
+        args = np.asarray(args)
+        if args.ndim == 2:
+            args = args[None]
+        weights = np.ones(target.shape) if weights is None else np.asarray(weights)
+        sigma = np.ones(target.shape) if sigma is None else np.asarray(sigma)
+        scale = np.sqrt(weights) / sigma
+
+        parameters = self._collect_free_params(init_params, verbose=verbose)
+        self._check_init_params(parameters, init_params)
+        x0 = np.tile(
+            self._configure_optimizer({}, init_params, parameters)["x0"],
+            (len(target), 1),
+        )
+
+        def _unpack(x):
+            params = {p: x[:, idx] for p, idx in parameters.index_map.items()}
+            params.update(self._freeze_dict)
+            return params
+
+        def _residuals(x):
+            return scale * (target - self._function(*args, **_unpack(x)))
+
+        def _jacobian(x, r):
+            function_gradient = self._gradient(*args, **_unpack(x))
+            blocks = []
+            for p in parameters.params:
+                shape = tuple(parameters.shapes[p]) + target.shape
+                derivative = np.broadcast_to(function_gradient[p], shape)
+                derivative = derivative.reshape((-1,) + target.shape)
+                blocks.append(-scale[..., None] * np.moveaxis(derivative, 0, -1))
+            return np.concatenate(blocks, axis=-1)
+
+        x, cost, jac, success, nit = levenberg_marquardt(
+            _residuals,
+            x0,
+            jacobian=_jacobian if self.has_gradient else None,
+            verbose=verbose,
+            **(options or {}),
+        )
+
+        num_residuals = target.shape[1]
+        covariance = np.linalg.pinv(np.einsum("nik,nil->nkl", jac, jac))
+        hess_inv = 0.5 * num_residuals * covariance
+        unc = np.sqrt(np.einsum("nkk->nk", covariance))
+        values = {}
+        uncertainties = {}
+        for p, value in self._freeze_dict.items():
+            values[p] = np.broadcast_to(value, (len(x),) + np.shape(value))
+            uncertainties[p] = np.full(values[p].shape, np.nan)
+        for p, idx in parameters.index_map.items():
+            shape = (len(x),) + tuple(parameters.shapes[p])
+            values[p] = x[:, idx].reshape(shape)
+            uncertainties[p] = unc[:, idx].reshape(shape)
+        function_values = 2.0 * cost / num_residuals
+        results = [
+            OptimizeResult(
+                x=x[i],
+                fun=function_values[i],
+                hess_inv=hess_inv[i],
+                covariance=covariance[i],
+                success=success[i],
+                nit=nit,
+            )
+            for i in range(len(x))
+        ]
+        return OptimizationResults(
+            self._function,
+            values,
+            function_values,
+            results,
+            uncertainties,
+            covariances=list(covariance),
+            parameters=parameters,
+            gradient=self._gradient,
+            vectorized=self._vectorized,
+        )
+
+    def fit_stochastic(
+        self,
+        batches: Union[Iterable[Union[tuple, pd.DataFrame]], Callable[[], Iterable]],
+        loss: Union[str, Callable] = "chi_squared",
+        optimizer: str = "adam",
+        epochs: int = 1,
+        tol: Optional[float] = None,
+        options: Dict[str, Any] = None,
+        verbose: bool = False,
+        **init_params,
+    ) -> OptimizationResult:
+        """Fits all free parameters of an optimizable function with a stochastic
+        optimizer that only ever holds one batch of the data in memory.
+
+        Every batch is prepared, evaluated and discarded in turn, so the batches can
+        be read lazily, e.g. from `pd.read_csv(path, chunksize=...)`. The gradient of
+        the loss of every batch is exact if both the function and the loss provide a
+        gradient, and is computed by forward differences otherwise.
+
+        Parameters
+        ----------
+        batches: iterable or callable
+            Iterable over batches, each either a DataFrame or a tuple
+            `(args_or_df, target, weights, sigma)` as for `fit_many`. An iterator
+            can only be consumed once, so for more than one epoch pass a callable
+            that returns a new iterable over the batches.
+        loss: string or callable
+            Loss function, see `fit`.
+        optimizer: str
+            "adam", "sgd" (with momentum) or "lbfgs" (stochastic L-BFGS with
+            curvature pairs of the full loss and a decaying learning rate).
+        epochs: int
+            Maximum number of passes over all batches.
+        tol: float, optional
+            Stop once the mean batch loss of an epoch changes by less than this
+            fraction of the previous epoch.
+        options: dict
+            Options of the optimizer, e.g. `learning_rate`. See
+            `optimazing._stochastic.stochastic_minimize`.
+        verbose: bool
+            Whether to print the mean batch loss after every epoch.
+        init_params: dict
+            Initial values for fit.
+
+        Returns
+        -------
+        OptimizationResult
+            With the mean batch loss of the last epoch as function value. Since the
+            full dataset is never evaluated at once, no uncertainties are estimated.
+
+        Example
+        -------
+        >>> @optimizable
+        ... linear(x, *, a, b):
+        ...     return a * x + b
+        ...
+        ... linear.fit_stochastic(
+        ...     lambda: ((chunk, "y") for chunk in pd.read_csv(path, chunksize=100000)),
+        ...     epochs=10,
+        ...     options={"learning_rate": 1e-2},
+        ...     a=1,
+        ...     b=0,
+        ... )
+        """
+        self._check_keyword_collisions(self.fit_stochastic)
+        loss = self._resolve_loss(loss)
+        parameters = self._collect_free_params(init_params, verbose=verbose)
+        self._check_init_params(parameters, init_params)
+        opt_config = self._configure_optimizer(None, init_params, parameters)
+        bounds = None
+        if "bounds" in opt_config:
+            bounds = tuple(np.array(opt_config["bounds"], dtype=float).T)
+        use_gradient = self.has_gradient and loss.has_gradient
+        source = batches if callable(batches) else (lambda: batches)
+
+        def _objectives():
+            for batch in source():
+                args_or_df, target, weights, sigma = self._load_inputs(
+                    *self._unpack_dataset(batch)
+                )
+                args = self._check_inputs(args_or_df, target)
+                target, weights, sigma = self._prepare_inputs(
+                    args_or_df, target, weights, sigma
+                )
+                objective = self._compile_objective(
+                    parameters,
+                    args,
+                    target,
+                    weights,
+                    sigma,
+                    loss,
+                    False,
+                    None,
+                    use_gradient,
+                )
+                if use_gradient:
+                    yield objective
+                else:
+                    yield partial(forward_difference_gradient, objective)
+
+        result = stochastic_minimize(
+            _objectives,
+            opt_config["x0"],
+            optimizer=optimizer,
+            epochs=epochs,
+            bounds=bounds,
+            tol=tol,
+            verbose=verbose,
+            **(options or {}),
+        )
+        values, uncertainties = self._extract_results(parameters, result)
+        return OptimizationResult(
+            self._function,
+            values,
+            result.fun,
+            result,
+            uncertainties,
+            parameters=parameters,
+            gradient=self._gradient,
+            vectorized=self._vectorized,
+        )
+
+    def fit_incremental(
+        self, forgetting: float = 1.0, verbose: bool = False, **init_params
+    ) -> IncrementalFit:
+        """Creates a chi squared fit of a function that is linear in all of its free
+        parameters, which is updated batch by batch.
+
+        Every batch is reduced to the weighted normal equations and discarded, so an
+        update costs one evaluation of the function per free coordinate on the new
+        batch only, and the current result a single solve of a k x k system.
+
+        Parameters
+        ----------
+        forgetting: float
+            Factor in (0, 1] that the statistics of all earlier batches are scaled by
+            when a new batch is added. Below one, older data is forgotten
+            exponentially, with an effective memory of about `1 / (1 - forgetting)`
+            batches.
+        verbose: bool
+            Whether to print the free parameters.
+        init_params: dict
+            Initial values of all free parameters, which only determine their shapes.
+
+        Returns
+        -------
+        IncrementalFit
+            Add batches with `update(args_or_df, target, weights, sigma)` and get the
+            current `OptimizationResult` from its `result` attribute. Whether the
+            function is linear is checked on the first batch.
+
+        Example
+        -------
+        >>> @optimizable
+        ... linear(x, *, a, b):
+        ...     return a * x + b
+        ...
+        ... fit = linear.fit_incremental(forgetting=0.99, a=1, b=0)
+        ... for x, y in stream:
+        ...     result = fit.update(x, y).result
+        """
+        self._check_keyword_collisions(self.fit_incremental)
+        if self.is_bounded:
+            raise ValueError("Bounded parameters are not supported by fit_incremental.")
+        parameters = self._collect_free_params(init_params, verbose=verbose)
+        self._check_init_params(parameters, init_params)
+        return IncrementalFit(self, parameters, forgetting=forgetting)
+
+    def _fit_dataset(
+        self, setup: "_FitSetup", dataset: Union[tuple, pd.DataFrame]
+    ) -> Tuple[dict, dict, float, Any]:
+        args_or_df, target, weights, sigma = self._load_inputs(
+            *self._unpack_dataset(dataset)
+        )
         args = self._check_inputs(args_or_df, target)
         target, weights, sigma = self._prepare_inputs(
             args_or_df, target, weights, sigma
         )
+        return self._fit_prepared(setup, args, target, weights, sigma)
+
+    def _setup_fit(
+        self,
+        loss: Union[str, BaseLoss],
+        options: Optional[dict],
+        verbose: bool,
+        solver: str,
+        init_params: dict,
+        cache_size: int = 0,
+        uncertainty: str = "auto",
+        chunk_size: Optional[int] = None,
+        callback: Optional[Callable] = None,
+        callback_every: int = 1,
+    ) -> "_FitSetup":
         loss = self._resolve_loss(loss)
+        self._check_solver(solver, loss)
+        self._check_uncertainty(uncertainty, loss)
         parameters = self._collect_free_params(init_params, verbose=verbose)
 
         self._check_init_params(parameters, init_params)
+        linear = [p for p in parameters.params if p in self._linear]
+        if solver == "linear":
+            linear = parameters.params
+        if chunk_size is not None and (
+            not isinstance(chunk_size, (int, np.integer))
+            or isinstance(chunk_size, bool)
+            or chunk_size < 1
+        ):
+            raise ValueError(
+                f"chunk_size has to be a positive integer, but found {chunk_size}."
+            )
+        if chunk_size is not None and (solver != "minimize" or len(linear) > 0):
+            raise ValueError(
+                "Chunked evaluation requires the minimize solver without linear "
+                "parameters."
+            )
+        if callback is not None and not callable(callback):
+            raise TypeError(f"Callback has to be callable, but found {callback}.")
+        if int(callback_every) < 1:
+            raise ValueError(
+                f"callback_every has to be positive, but found {callback_every}."
+            )
+        if callback is not None:
+            self._check_callback_support(solver, options)
+        if len(linear) == 0:
+            opt_config = self._configure_optimizer(options, init_params, parameters)
+            return _FitSetup(
+                parameters,
+                loss,
+                opt_config,
+                solver,
+                verbose,
+                cache_size=cache_size,
+                uncertainty=uncertainty,
+                chunk_size=chunk_size,
+                callback=callback,
+                callback_every=int(callback_every),
+            )
+
+        if loss is not chi_squared:
+            raise ValueError(
+                f"Linear parameters require the chi_squared loss, but found {loss}."
+            )
+        for p in linear:
+            if p in self._bounds_dict:
+                raise ValueError(f"Linear parameter {p} cannot be bounded.")
+        linear_parameters = Parameters(**{p: parameters.shapes[p] for p in linear})
+        nonlinear_parameters = Parameters(
+            **{p: s for p, s in parameters.shapes.items() if p not in linear}
+        )
+        opt_config = None
+        if len(nonlinear_parameters.params) > 0:
+            opt_config = self._configure_optimizer(
+                options, init_params, nonlinear_parameters
+            )
+        return _FitSetup(
+            parameters,
+            loss,
+            opt_config,
+            solver,
+            verbose,
+            linear_parameters,
+            nonlinear_parameters,
+            cache_size,
+            uncertainty,
+            callback=callback,
+            callback_every=int(callback_every),
+        )
+
+    @staticmethod
+    def _check_callback_support(solver: str, options: Optional[dict]):
+        options = options or {}
+        if "callback" in options:
+            raise ValueError(
+                "A callback cannot be given both as argument and in the options."
+            )
+        if solver != "least_squares":
+            return
+        if "callback" not in signature(least_squares).parameters:
+            raise ValueError(
+                "Callbacks with the least_squares solver require a version of scipy "
+                "whose least_squares accepts a callback."
+            )
+        if options.get("method") == "lm":
+            raise ValueError(
+                'Callbacks are not supported by the "lm" method of least_squares.'
+            )
+
+    def _fit_prepared(
+        self,
+        setup: "_FitSetup",
+        args: List[np.ndarray],
+        target: np.ndarray,
+        weights: np.ndarray,
+        sigma: np.ndarray,
+        stats: Optional[FitStats] = None,
+    ) -> Tuple[dict, dict, float, Any]:
+        """Solves a prepared fit. Evaluation counters and timings are recorded in
+        `stats` (a new `FitStats` by default), which is attached to the optimizer
+        result as `result.stats`."""
+        if stats is None:
+            stats = FitStats()
+        with stats.stage("solver"):
+            if setup.linear_parameters is not None:
+                result, function_value = self._variable_projection(
+                    setup, args, target, weights, sigma, stats=stats
+                )
+            elif setup.solver == "least_squares":
+                result, function_value = self._least_squares(
+                    setup.parameters,
+                    args,
+                    target,
+                    weights,
+                    sigma,
+                    setup.opt_config,
+                    setup.verbose,
+                    cache_size=setup.cache_size,
+                    stats=stats,
+                    callback=setup.callback,
+                    callback_every=setup.callback_every,
+                )
+            else:
+                result, function_value = self._minimize(
+                    setup.parameters,
+                    args,
+                    target,
+                    weights,
+                    sigma,
+                    setup.loss,
+                    setup.opt_config,
+                    setup.verbose,
+                    cache_size=setup.cache_size,
+                    chunk_size=setup.chunk_size,
+                    stats=stats,
+                    callback=setup.callback,
+                    callback_every=setup.callback_every,
+                )
+        stats.finish_solver()
+
+        method = setup.uncertainty
+        if method == "auto":
+            if hasattr(getattr(result, "hess_inv", None), "diagonal"):
+                method = "optimizer"
+            else:
+                method = "jacobian" if setup.loss is chi_squared else "hessian"
+        if method != "optimizer":
+            with stats.stage("uncertainty"):
+                result.hess_inv = self._estimate_hess_inv(
+                    method,
+                    setup.parameters,
+                    args,
+                    target,
+                    weights,
+                    sigma,
+                    setup.loss,
+                    result.x,
+                    chunk_size=setup.chunk_size,
+                )
+
+        hess_inv = getattr(result, "hess_inv", None)
+        if hasattr(hess_inv, "diagonal"):
+            result.covariance = self._covariance(
+                np.asarray(hess_inv), setup.loss, np.size(target)
+            )
+        result.stats = stats
+        values, uncertainties = self._extract_results(setup.parameters, result)
+        return values, uncertainties, function_value, result
+
+    def fit_bootstrap(
+        self,
+        args_or_df: Union[Iterable[Iterable[float]], Iterable[float], pd.DataFrame],
+        target: Union[Iterable[float], str] = None,
+        loss: Union[str, Callable] = "chi_squared",
+        weights: Optional[Union[Iterable[float], str]] = None,
+        sigma: Optional[Union[Iterable[float], str]] = None,
+        options: Dict[str, Any] = None,
+        verbose: bool = False,
+        solver: str = "minimize",
+        n_resamples: int = 1000,
+        confidence: float = 0.6827,
+        seed: Optional[int] = None,
+        n_jobs: Optional[int] = 1,
+        chunksize: int = 16,
+        **init_params,
+    ) -> OptimizationResult:
+        """Fits all free parameters of an optimizable function and estimates their
+        uncertainties by bootstrapping, which unlike the inverse hessian does not
+        assume the loss to be quadratic around the minimum.
+
+        Every resample draws as many data points with replacement as there are in the
+        dataset. Instead of copying the data, the number of times every data point was
+        drawn is multiplied into its weight, which requires a loss that weights every
+        data point linearly, like all built-in losses. All refits start from the
+        point estimate.
+
+        Parameters
+        ----------
+        args_or_df, target, loss, weights, sigma, options, verbose, solver
+            See `fit`.
+        n_resamples: int
+            Number of bootstrap resamples.
+        confidence: float
+            Confidence level of the percentile intervals, by default one sigma.
+        seed: int, optional
+            Seed for drawing the resamples.
+        n_jobs: int, optional
+            Number of worker processes, see `fit_many`. The data is sent to every
+            worker once.
+        chunksize: int
+            Number of resamples that are sent to a worker process at once.
+        init_params: dict
+            Initial values for fit.
+
+        Returns
+        -------
+        OptimizationResult
+            The fit to the full dataset. The uncertainty of every parameter is the
+            sample standard deviation over all resamples, and `interval` holds the
+            percentile interval. The covariance matrix is estimated from the
+            resamples, too, and `ensemble` holds their results. Both are on the same
+            scale as the covariance that `fit` derives from the inverse hessian.
+
+        Example
+        -------
+        >>> @optimizable
+        ... linear(x, *, a, b):
+        ...     return a * x + b
+        ...
+        ... result = linear.fit_bootstrap(x, y, loss="laplace", n_jobs=4, a=1, b=0)
+        ... result.a.interval
+        """
+        self._check_keyword_collisions(self.fit_bootstrap)
+        args_or_df, target, weights, sigma = self._load_inputs(
+            args_or_df, target, weights, sigma
+        )
+        args = self._check_inputs(args_or_df, target)
+        data = (args,) + tuple(
+            np.asarray(v)
+            for v in self._prepare_inputs(args_or_df, target, weights, sigma)
+        )
+        setup = self._setup_fit(loss, options, verbose, solver, init_params)
+        best = self._make_result(setup, *self._fit_prepared(setup, *data))
+
+        values = {p: best._fit_values[p].value for p in setup.parameters.params}
+        resample_setup = setup.with_start_at(values).replace(uncertainty="optimizer")
+        seeds = np.random.RandomState(seed).randint(2**31 - 1, size=n_resamples)
+        if n_jobs == 1:
+            columns = [self._fit_resample(resample_setup, data, s) for s in seeds]
+        else:
+            columns = fit_resamples_in_pool(
+                self, resample_setup, data, seeds, n_jobs, chunksize
+            )
+        # Optimizers often report failure on non-smooth losses like laplace even
+        # though they are at the minimum, so only failed evaluations are dropped.
+        columns = [c for c in columns if np.isfinite(c[2])]
+
+        ensemble = self._collect_results(setup, columns)
+        percentiles = 50.0 + 50.0 * confidence * np.array([-1.0, 1.0])
+        for p in setup.parameters.params:
+            replicas = ensemble._fit_values[p].value
+            lower, upper = np.percentile(replicas, percentiles, axis=0)
+            best._fit_values[p] = ParameterValue(
+                best._fit_values[p].value,
+                np.std(replicas, axis=0, ddof=1),
+                (lower, upper),
+            )
+        flat = np.array(
+            [
+                setup.parameters.flatten(
+                    **{p: c[0][p] for p in setup.parameters.params}
+                )
+                for c in columns
+            ]
+        )
+        best.covariance = np.atleast_2d(np.cov(flat, rowvar=False))
+        best.ensemble = ensemble
+        return best
+
+    def _fit_resample(
+        self, setup: "_FitSetup", data: tuple, seed: int
+    ) -> Tuple[dict, dict, float, Any]:
+        """Fits a bootstrap resample of the prepared `data`, drawn with `seed`, by
+        multiplying the number of draws of every data point into its weight."""
+        args, target, weights, sigma = data
+        indices = np.random.RandomState(seed).randint(len(target), size=len(target))
+        counts = np.bincount(indices, minlength=len(target))
+        counts = counts.reshape(counts.shape + (1,) * (np.ndim(weights) - 1))
+        return self._fit_prepared(setup, args, target, weights * counts, sigma)
+
+    def _make_result(
+        self,
+        setup: "_FitSetup",
+        values: dict,
+        uncertainties: dict,
+        function_value: float,
+        result: Any,
+    ) -> OptimizationResult:
+        hess_inv = getattr(result, "hess_inv", None)
+        return OptimizationResult(
+            self._function,
+            values,
+            function_value,
+            result,
+            uncertainties,
+            covariance=getattr(result, "covariance", None),
+            parameters=setup.parameters,
+            gradient=self._gradient,
+            vectorized=self._vectorized,
+            refit=partial(self._refit, setup, values, hess_inv),
+            stats=getattr(result, "stats", None),
+        )
+
+    def _refit(
+        self,
+        setup: "_FitSetup",
+        values: dict,
+        hess_inv: Any,
+        args_or_df: Any,
+        target: Any = None,
+        weights: Any = None,
+        sigma: Any = None,
+        options: Optional[dict] = None,
+    ) -> OptimizationResult:
+        """Fits new data with `setup`, starting at the parameter `values` of a previous
+        fit and, for BFGS, at its inverse hessian. The warm start is not part of the
+        setup of the new result, which is refitted from its own solution."""
+        if options and setup.opt_config is not None:
+            setup = setup.replace(opt_config={**setup.opt_config, **options})
+        warm_setup = setup.with_start_at(values)
+        if setup.opt_config is not None:
+            opt_config = warm_setup.opt_config
+            method = opt_config.get(
+                "method", "L-BFGS-B" if "bounds" in opt_config else "BFGS"
+            )
+            if (
+                setup.solver == "minimize"
+                and setup.linear_parameters is None
+                and str(method).upper() == "BFGS"
+                and self._is_positive_definite(hess_inv, len(opt_config["x0"]))
+            ):
+                # BFGS requires an exactly symmetric matrix.
+                opt_config["options"] = {
+                    "hess_inv0": 0.5 * (hess_inv + hess_inv.T),
+                    **opt_config.get("options", {}),
+                }
+        args_or_df, target, weights, sigma = self._load_inputs(
+            args_or_df, target, weights, sigma
+        )
+        args = self._check_inputs(args_or_df, target)
+        target, weights, sigma = self._prepare_inputs(
+            args_or_df, target, weights, sigma
+        )
+        return self._make_result(
+            setup, *self._fit_prepared(warm_setup, args, target, weights, sigma)
+        )
+
+    @staticmethod
+    def _is_positive_definite(matrix: Any, size: int) -> bool:
+        if not isinstance(matrix, np.ndarray) or matrix.shape != (size, size):
+            return False
+        if not np.all(np.isfinite(matrix)):
+            return False
+        try:
+            np.linalg.cholesky(matrix)
+        except np.linalg.LinAlgError:
+            return False
+        return True
+
+    def _unpack_dataset(self, dataset: Union[tuple, pd.DataFrame]) -> tuple:
+        if isinstance(dataset, pd.DataFrame):
+            dataset = (dataset,)
+        if not 1 <= len(dataset) <= 4:
+            raise ValueError(
+                "Every dataset has to be a DataFrame or a tuple (args_or_df, target, "
+                f"weights, sigma), but found a tuple of length {len(dataset)}."
+            )
+        return tuple(dataset) + (None,) * (4 - len(dataset))
+
+    def _collect_results(
+        self, setup: "_FitSetup", columns: List[tuple]
+    ) -> OptimizationResults:
+        shapes = {p: np.shape(v) for p, v in self._freeze_dict.items()}
+        shapes.update(setup.parameters.shapes)
+        values = {}
+        uncertainties = {}
+        for p, shape in shapes.items():
+            column_shape = (len(columns),) + tuple(shape)
+            values[p] = np.reshape([c[0][p] for c in columns], column_shape)
+            uncertainties[p] = np.reshape(
+                [np.nan if c[1][p] is None else c[1][p] for c in columns],
+                column_shape,
+            )
+        function_values = np.array([c[2] for c in columns], dtype=float)
+        results = [c[3] for c in columns]
+        return OptimizationResults(
+            self._function,
+            values,
+            function_values,
+            results,
+            uncertainties,
+            covariances=[getattr(r, "covariance", None) for r in results],
+            parameters=setup.parameters,
+            gradient=self._gradient,
+            vectorized=self._vectorized,
+        )
+
+    def _check_solver(self, solver: str, loss: BaseLoss):
+        if solver not in ["minimize", "least_squares", "linear"]:
+            raise ValueError(
+                f"Unknown solver '{solver}', has to be 'minimize', 'least_squares' or "
+                "'linear'."
+            )
+        if solver in ["least_squares", "linear"] and loss is not chi_squared:
+            raise ValueError(
+                f"The {solver} solver requires the chi_squared loss, but found {loss}."
+            )
+
+    def _check_uncertainty(self, uncertainty: str, loss: BaseLoss):
+        if uncertainty not in UNCERTAINTY_METHODS:
+            raise ValueError(
+                f"Unknown uncertainty method '{uncertainty}', has to be one of "
+                f"{UNCERTAINTY_METHODS}."
+            )
+        if uncertainty == "jacobian" and loss is not chi_squared:
+            raise ValueError(
+                "Uncertainties from the jacobian require the chi_squared loss, but "
+                f"found {loss}."
+            )
+
+    def _minimize(
+        self,
+        parameters: Parameters,
+        args: List[np.ndarray],
+        target: np.ndarray,
+        weights: np.ndarray,
+        sigma: np.ndarray,
+        loss: BaseLoss,
+        opt_config: dict,
+        verbose: bool,
+        projection: Optional[Callable] = None,
+        cache_size: int = 0,
+        chunk_size: Optional[int] = None,
+        stats: Optional[FitStats] = None,
+        callback: Optional[Callable] = None,
+        callback_every: int = 1,
+    ) -> Tuple[Any, float]:
+        use_gradient = (
+            self.has_gradient and loss.has_gradient and "jac" not in opt_config
+        )
+        _optimization_function = self._compile_objective(
+            parameters,
+            args,
+            target,
+            weights,
+            sigma,
+            loss,
+            verbose,
+            projection,
+            use_gradient,
+            chunk_size,
+            stats,
+        )
+        if cache_size > 0:
+            _optimization_function = EvaluationCache(cache_size).wrap(
+                _optimization_function
+            )
+        if callback is not None:
+            objective = _optimization_function
+            opt_config = {
+                **opt_config,
+                "callback": iteration_callback(
+                    parameters,
+                    callback,
+                    callback_every,
+                    loss_at=(lambda p: objective(p)[0]) if use_gradient else objective,
+                ),
+            }
+        if use_gradient:
+            opt_config = {**opt_config, "jac": True}
+
+        if verbose:
+            print("Running minimize with config:")
+            print(opt_config)
+
+        result = minimize(_optimization_function, **opt_config)
+        return result, result.fun
+
+    def _compile_objective(
+        self,
+        parameters: Parameters,
+        args: List[np.ndarray],
+        target: np.ndarray,
+        weights: np.ndarray,
+        sigma: np.ndarray,
+        loss: BaseLoss,
+        verbose: bool,
+        projection: Optional[Callable],
+        use_gradient: bool,
+        chunk_size: Optional[int] = None,
+        stats: Optional[FitStats] = None,
+    ) -> Callable:
+        """Builds the function of the flat parameters that is passed to minimize.
+
+        Everything that does not depend on the parameters is resolved here once,
+        including the parts of the loss that only depend on `target`, `weights` and
+        `sigma`, so that a call of the plain objective only fills in the parameters,
+        evaluates the function and evaluates the loss.
+
+        With `chunk_size`, one objective is built per block of data points (on views
+        into the data) and their losses are summed, weighted by the fraction of data
+        points in every block, which equals the mean over all data points.
+
+        With `stats`, the evaluations of the function, its gradient and the loss are
+        counted and timed."""
+        target = np.asarray(target)
+        weights = np.asarray(weights)
+        sigma = np.asarray(sigma)
+
+        if chunk_size is not None and chunk_size < len(target):
+            chunks = []
+            for start in range(0, len(target), chunk_size):
+                block = slice(start, start + chunk_size)
+                objective = self._compile_objective(
+                    parameters,
+                    [arg[block] for arg in args],
+                    target[block],
+                    weights[block],
+                    sigma[block],
+                    loss,
+                    verbose,
+                    projection,
+                    use_gradient,
+                    stats=stats,
+                )
+                chunks.append((len(target[block]) / len(target), objective))
+
+            def _chunked_optimization_function(p):
+                outputs = [(fraction, objective(p)) for fraction, objective in chunks]
+                if use_gradient:
+                    return (
+                        sum(fraction * output[0] for fraction, output in outputs),
+                        sum(fraction * output[1] for fraction, output in outputs),
+                    )
+                return sum(fraction * output for fraction, output in outputs)
+
+            return _chunked_optimization_function
+
+        function = self._function
+        parameter_gradient = self._parameter_gradient
+        if stats is not None:
+            function = stats.timed("model", function)
+            parameter_gradient = stats.timed("gradient", parameter_gradient)
+
+        if verbose or projection is not None:
+            loss_function = loss if stats is None else stats.timed("loss", loss)
+            loss_gradient_function = (
+                loss.gradient
+                if stats is None
+                else stats.timed("loss_gradient", loss.gradient)
+            )
+
+            def _optimization_function(p):
+                if verbose:
+                    print(f"Calling optimization function with parameters {p}")
+                params = parameters.unflatten(p)
+                params.update(self._freeze_dict)
+                if projection is not None:
+                    params.update(projection(params))
+                if verbose:
+                    print(f"Unpacked parameters to {params}")
+                y_est = function(*args, **params)
+                output = loss_function(target, y_est, weights, sigma)
+                if verbose:
+                    print(f"Loss: {output}")
+                if use_gradient:
+                    loss_gradient = loss_gradient_function(
+                        target, y_est, weights, sigma
+                    )
+                    jac = parameter_gradient(parameters, args, params, loss_gradient)
+                    return output, jac
+                return output
+
+            return _optimization_function
+
+        loss_function = loss.prepare(target, weights, sigma)
+        if stats is not None:
+            loss_function = stats.timed("loss", loss_function)
+        unflatten = parameters.unflatten
+        params = dict(self._freeze_dict)
+
+        if use_gradient:
+            loss_gradient_function = loss.prepare_gradient(target, weights, sigma)
+            if stats is not None:
+                loss_gradient_function = stats.timed(
+                    "loss_gradient", loss_gradient_function
+                )
+
+            def _optimization_function_with_gradient(p):
+                unflatten(p, params)
+                y_est = function(*args, **params)
+                loss_gradient = loss_gradient_function(y_est)
+                return (
+                    loss_function(y_est),
+                    parameter_gradient(parameters, args, params, loss_gradient),
+                )
+
+            return _optimization_function_with_gradient
 
         def _optimization_function(p):
-            if verbose:
-                print(f"Calling optimization function with parameters {p}")
+            unflatten(p, params)
+            return loss_function(function(*args, **params))
+
+        return _optimization_function
+
+    def _least_squares(
+        self,
+        parameters: Parameters,
+        args: List[np.ndarray],
+        target: np.ndarray,
+        weights: np.ndarray,
+        sigma: np.ndarray,
+        opt_config: dict,
+        verbose: bool,
+        projection: Optional[Callable] = None,
+        cache_size: int = 0,
+        stats: Optional[FitStats] = None,
+        callback: Optional[Callable] = None,
+        callback_every: int = 1,
+    ) -> Tuple[Any, float]:
+        scale = np.sqrt(np.asarray(weights)) / np.asarray(sigma)
+        target = np.asarray(target)
+        function = self._function
+        if stats is not None:
+            function = stats.timed("model", function)
+
+        def _unpack(p):
             params = parameters.unflatten(p)
             params.update(self._freeze_dict)
+            if projection is not None:
+                params.update(projection(params))
             if verbose:
                 print(f"Unpacked parameters to {params}")
-            output = loss(target, self._function(*args, **params), weights, sigma)
-            if verbose:
-                print(f"Loss: {output}")
-            return output
+            return params
 
-        opt_config = self._configure_optimizer(options, init_params, parameters)
+        if verbose or projection is not None:
+
+            def _residuals(p):
+                if verbose:
+                    print(f"Calling residuals with parameters {p}")
+                params = _unpack(p)
+                output = scale * (target - function(*args, **params))
+                return output.ravel()
+
+        else:
+            unflatten = parameters.unflatten
+            params = dict(self._freeze_dict)
+
+            def _residuals(p):
+                unflatten(p, params)
+                return (scale * (target - function(*args, **params))).ravel()
+
+        def _jacobian(p):
+            return self._residual_jacobian(
+                parameters, args, _unpack(p), scale, stats=stats
+            )
+
+        if cache_size > 0:
+            _residuals = EvaluationCache(cache_size).wrap(_residuals)
+
+        opt_config = dict(opt_config)
+        if callback is not None:
+            opt_config["callback"] = iteration_callback(
+                parameters, callback, callback_every
+            )
+        if "bounds" in opt_config:
+            lower, upper = np.array(opt_config.pop("bounds"), dtype=float).T
+            opt_config["bounds"] = (
+                np.where(np.isnan(lower), -np.inf, lower),
+                np.where(np.isnan(upper), np.inf, upper),
+            )
+        # With a projection, the function gradient alone does not give the jacobian
+        # of the projected residuals, so it is left to finite differences.
+        if self.has_gradient and projection is None and "jac" not in opt_config:
+            opt_config["jac"] = _jacobian
 
         if verbose:
-            print("Running minimize with config:")
+            print("Running least_squares with config:")
             print(opt_config)
 
-        result = minimize(_optimization_function, **opt_config)
+        result = least_squares(_residuals, **opt_config)
+        # Inverse hessian of the mean chi squared, the same quantity minimize reports
+        # as `hess_inv`, so that covariances follow from it alike for every solver.
+        num_residuals = result.fun.size
+        result.hess_inv = (
+            0.5 * num_residuals * np.linalg.pinv(result.jac.T @ result.jac)
+        )
+        return result, 2.0 * result.cost / num_residuals
 
-        values, uncertainties = self._extract_results(parameters, result)
-        return OptimizationResult(
-            self._function, values, result.fun, result, uncertainties
+    def _variable_projection(
+        self,
+        setup: "_FitSetup",
+        args: List[np.ndarray],
+        target: np.ndarray,
+        weights: np.ndarray,
+        sigma: np.ndarray,
+        stats: Optional[FitStats] = None,
+    ) -> Tuple[Any, float]:
+        scale = np.sqrt(np.asarray(weights)) / np.asarray(sigma)
+        target = np.asarray(target)
+        linear_parameters = setup.linear_parameters
+        nonlinear_parameters = setup.nonlinear_parameters
+
+        def _projection(params):
+            return self._solve_linear(
+                linear_parameters, args, target, scale, params, stats
+            )
+
+        if len(nonlinear_parameters.params) == 0:
+            report = None
+            if setup.callback is not None:
+                report = iteration_callback(linear_parameters, setup.callback)
+            result, function_value = self._linear_least_squares(
+                linear_parameters, args, target, scale, stats
+            )
+            if report is not None:
+                report(result)
+            return result, function_value
+        if setup.solver == "least_squares":
+            result, _ = self._least_squares(
+                nonlinear_parameters,
+                args,
+                target,
+                weights,
+                sigma,
+                setup.opt_config,
+                setup.verbose,
+                _projection,
+                cache_size=setup.cache_size,
+                stats=stats,
+                callback=setup.callback,
+                callback_every=setup.callback_every,
+            )
+        else:
+            result, _ = self._minimize(
+                nonlinear_parameters,
+                args,
+                target,
+                weights,
+                sigma,
+                setup.loss,
+                setup.opt_config,
+                setup.verbose,
+                _projection,
+                cache_size=setup.cache_size,
+                stats=stats,
+                callback=setup.callback,
+                callback_every=setup.callback_every,
+            )
+        params = nonlinear_parameters.unflatten(result.x)
+        params.update(self._freeze_dict)
+        params.update(_projection(params))
+
+        # Report all free parameters, with the inverse hessian of the mean chi squared
+        # from the full jacobian at the optimum.
+        parameters = setup.parameters
+        function = self._function
+        if stats is not None:
+            function = stats.timed("model", function)
+        residuals = scale * (target - function(*args, **params))
+        jac = self._residual_jacobian(parameters, args, params, scale, stats=stats)
+        result.x = parameters.flatten(**{p: params[p] for p in parameters.params})
+        result.hess_inv = 0.5 * residuals.size * np.linalg.pinv(jac.T @ jac)
+        return result, np.mean(residuals**2)
+
+    def _linear_least_squares(
+        self,
+        linear_parameters: Parameters,
+        args: List[np.ndarray],
+        target: np.ndarray,
+        scale: np.ndarray,
+        stats: Optional[FitStats] = None,
+    ) -> Tuple[Any, float]:
+        """Fits a function that is linear in all free parameters in closed form, using
+        a QR decomposition of the weighted design matrix."""
+        params = dict(self._freeze_dict)
+        offset, design = self._linear_design(linear_parameters, args, params, stats)
+        weighted_design = scale[..., None] * design
+        q, r = np.linalg.qr(weighted_design.reshape(-1, linear_parameters.size))
+        coefficients = np.linalg.lstsq(
+            r, q.T @ (scale * (target - offset)).ravel(), rcond=None
+        )[0]
+        y_est = self._check_linear(
+            linear_parameters, args, params, offset, design, coefficients, stats
+        )
+        residuals = scale * (target - y_est)
+        r_inv = np.linalg.pinv(r)
+        result = OptimizeResult(
+            x=coefficients,
+            success=True,
+            status=0,
+            message="Solved linear parameters in closed form.",
+            fun=np.mean(residuals**2),
+            nit=0,
+            nfev=linear_parameters.size + 2,
+            hess_inv=0.5 * residuals.size * r_inv @ r_inv.T,
         )
+        return result, np.mean(residuals**2)
+
+    def _check_linear(
+        self,
+        linear_parameters: Parameters,
+        args: List[np.ndarray],
+        params: dict,
+        offset: np.ndarray,
+        design: np.ndarray,
+        coefficients: np.ndarray,
+        stats: Optional[FitStats] = None,
+    ) -> np.ndarray:
+        """Evaluates the function at `coefficients` and raises if the output differs
+        from the linear prediction of `offset` and `design`."""
+        function = self._function
+        if stats is not None:
+            function = stats.timed("model", function)
+        y_est = function(*args, **params, **linear_parameters.unflatten(coefficients))
+        expected = offset + design @ coefficients
+        atol = 1e-8 * np.max(np.abs(expected), initial=1.0)
+        if not np.allclose(y_est, expected, rtol=1e-6, atol=atol):
+            raise ValueError(
+                f"Function {self._name} is not linear in its free parameters "
+                f"{linear_parameters.params}."
+            )
+        return y_est
+
+    def _linear_design(
+        self,
+        linear_parameters: Parameters,
+        args: List[np.ndarray],
+        params: dict,
+        stats: Optional[FitStats] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Evaluates the function with all linear parameters set to zero and with each
+        linear coordinate set to one, giving the offset and the design matrix (with the
+        coordinates along the last axis)."""
+        function = self._function
+        if stats is not None:
+            function = stats.timed("model", function)
+        num_linear = linear_parameters.size
+        offset = function(
+            *args, **params, **linear_parameters.unflatten(np.zeros(num_linear))
+        )
+        design = np.stack(
+            [
+                function(*args, **params, **linear_parameters.unflatten(e)) - offset
+                for e in np.eye(num_linear)
+            ],
+            axis=-1,
+        )
+        return offset, design
+
+    def _solve_linear(
+        self,
+        linear_parameters: Parameters,
+        args: List[np.ndarray],
+        target: np.ndarray,
+        scale: np.ndarray,
+        params: dict,
+        stats: Optional[FitStats] = None,
+    ) -> dict:
+        """Solves for the linear parameters by weighted linear least squares, given all
+        other parameters in `params`."""
+        offset, design = self._linear_design(linear_parameters, args, params, stats)
+        coefficients = np.linalg.lstsq(
+            (scale[..., None] * design).reshape(-1, linear_parameters.size),
+            (scale * (target - offset)).ravel(),
+            rcond=None,
+        )[0]
+        return linear_parameters.unflatten(coefficients)
+
+    def _residual_jacobian(
+        self,
+        parameters: Parameters,
+        args: List[np.ndarray],
+        params: dict,
+        scale: np.ndarray,
+        epsilon: float = 1.49e-8,
+        stats: Optional[FitStats] = None,
+    ) -> np.ndarray:
+        """Jacobian of the residuals `scale * (y_true - y_est)` with respect to all
+        free parameters, of shape (num_residuals, num_free_params). Uses the function
+        gradient if available and forward differences otherwise."""
+        function = self._function
+        gradient = self._gradient
+        if stats is not None:
+            function = stats.timed("model", function)
+            gradient = stats.timed("gradient", gradient)
+        if self.has_gradient:
+            function_gradient = gradient(*args, **params)
+            blocks = []
+            for k in parameters.params:
+                shape = tuple(parameters.shapes[k]) + scale.shape
+                derivative = np.broadcast_to(function_gradient[k], shape)
+                blocks.append(-(scale * derivative).reshape(-1, scale.size))
+            return np.concatenate(blocks).T
+
+        x = parameters.flatten(**{k: params[k] for k in parameters.params})
+        y_est = function(*args, **params)
+        jac = np.empty((np.size(y_est), len(x)))
+        for j in range(len(x)):
+            step = epsilon * max(1.0, abs(x[j]))
+            x_step = x.copy()
+            x_step[j] += step
+            params_step = {**params, **parameters.unflatten(x_step)}
+            y_step = function(*args, **params_step)
+            jac[:, j] = (-scale * (y_step - y_est) / step).ravel()
+        return jac
+
+    def _estimate_hess_inv(
+        self,
+        method: str,
+        parameters: Parameters,
+        args: List[np.ndarray],
+        target: np.ndarray,
+        weights: np.ndarray,
+        sigma: np.ndarray,
+        loss: BaseLoss,
+        x: np.ndarray,
+        chunk_size: Optional[int] = None,
+    ) -> np.ndarray:
+        """Inverse hessian of the mean loss at the flat parameters `x`, independent of
+        the optimizer that found them. With method "jacobian", the hessian of the chi
+        squared is approximated by the jacobian of the residuals, otherwise it is
+        computed by central differences of the loss.
+
+        With `chunk_size`, the function is only evaluated on blocks of data points:
+        `J^T J` is accumulated block by block, and the loss at every point of the
+        finite difference stencil is evaluated like the chunked objective of the fit."""
+        target = np.asarray(target)
+        weights = np.asarray(weights)
+        sigma = np.asarray(sigma)
+        params = parameters.unflatten(x)
+        params.update(self._freeze_dict)
+        chunked = chunk_size is not None and chunk_size < len(target)
+
+        if method == "jacobian":
+            scale = np.sqrt(weights) / sigma
+            if not chunked:
+                jac = self._residual_jacobian(parameters, args, params, scale)
+                return 0.5 * scale.size * np.linalg.pinv(jac.T @ jac)
+            jtj = np.zeros((parameters.size, parameters.size))
+            for start in range(0, len(target), chunk_size):
+                block = slice(start, start + chunk_size)
+                jac = self._residual_jacobian(
+                    parameters, [arg[block] for arg in args], params, scale[block]
+                )
+                jtj += jac.T @ jac
+            return 0.5 * scale.size * np.linalg.pinv(jtj)
+
+        if chunked:
+            objective = self._compile_objective(
+                parameters,
+                args,
+                target,
+                weights,
+                sigma,
+                loss,
+                False,
+                None,
+                False,
+                chunk_size,
+            )
+            return inverse_hessian(
+                numerical_hessian(lambda points: [objective(p) for p in points], x)
+            )
+
+        loss_function = loss.prepare(target, weights, sigma)
+
+        def _objective(points):
+            if self._vectorized:
+                params = {p: points[:, i] for p, i in parameters.index_map.items()}
+                params.update(self._freeze_dict)
+                y_est = self._function(*args, **params)
+                return [loss_function(y) for y in y_est]
+            return [
+                loss_function(
+                    self._function(
+                        *args, **parameters.unflatten(point, dict(self._freeze_dict))
+                    )
+                )
+                for point in points
+            ]
+
+        return inverse_hessian(numerical_hessian(_objective, x))
+
+    def _parameter_gradient(
+        self,
+        parameters: Parameters,
+        args: List[np.ndarray],
+        params: dict,
+        loss_gradient: np.ndarray,
+    ) -> np.ndarray:
+        """Chains the loss gradient with the function gradient to get the flat
+        gradient of the loss with respect to all free parameters."""
+        function_gradient = self._gradient(*args, **params)
+        loss_gradient = np.asarray(loss_gradient)
+        jac = {}
+        for p in parameters.params:
+            shape = tuple(parameters.shapes[p]) + loss_gradient.shape
+            derivative = np.broadcast_to(function_gradient[p], shape)
+            jac[p] = np.tensordot(derivative, loss_gradient, axes=loss_gradient.ndim)
+        return parameters.flatten(**jac)
+
+    def _check_keyword_collisions(self, method: Callable):
+        """Raises if a free parameter shares its name with a keyword of `method`, which
+        would swallow its initial value. Only the keywords of `fit` are forbidden
+        parameter names altogether."""
+        keywords = signature(method).parameters
+        for p in self._parameters:
+            if p in keywords and p not in self._freeze_dict:
+                raise ValueError(
+                    f"Parameter {p} collides with a keyword of {method.__name__}, "
+                    "freeze it or rename it."
+                )
 
     def _check_init_params(self, parameters: Parameters, init_params: dict):
         for p in init_params:
@@ -267,13 +2078,21 @@ class OptimizableFunction:
             if p in self._freeze_dict:
                 raise ValueError(f"Specified frozen parameter {p}.")
 
+    @staticmethod
+    def _covariance(hess_inv: np.ndarray, loss: BaseLoss, num_points: int):
+        """Covariance of the parameters from the inverse hessian of the mean loss. The
+        summed loss is `likelihood_factor` times the negative log likelihood, whose
+        inverse hessian is the covariance."""
+        return loss.likelihood_factor / num_points * hess_inv
+
     def _extract_results(
         self, parameters: Parameters, result: Any
     ) -> Tuple[dict, dict]:
         values = parameters.unflatten(result.x)
         values.update(self._freeze_dict)
-        if hasattr(result, "hess_inv") and hasattr(result.hess_inv, "diagonal"):
-            _unc = np.sqrt(result.hess_inv.diagonal())
+        covariance = getattr(result, "covariance", None)
+        if covariance is not None:
+            _unc = np.sqrt(np.diagonal(covariance))
             uncertainties = parameters.unflatten(_unc)
         else:
             uncertainties = {p: None for p in parameters.params}
@@ -290,15 +2109,22 @@ class OptimizableFunction:
         }
         opt_config.update(options or {})
         if self.is_bounded:
+            # Open bounds are infinite, which every bounded method of minimize
+            # understands.
+            bounds = {
+                p: self._bounds_dict.get(p, (None, None)) for p in parameters.params
+            }
             lower = {
                 p: np.broadcast_to(
-                    self._bounds_dict.get(p, (None, None))[0], parameters.shapes[p]
+                    -np.inf if bounds[p][0] is None else bounds[p][0],
+                    parameters.shapes[p],
                 )
                 for p in parameters.params
             }
             upper = {
                 p: np.broadcast_to(
-                    self._bounds_dict.get(p, (None, None))[1], parameters.shapes[p]
+                    np.inf if bounds[p][1] is None else bounds[p][1],
+                    parameters.shapes[p],
                 )
                 for p in parameters.params
             }
@@ -341,7 +2167,11 @@ class OptimizableFunction:
 
     def _check_inputs(
         self, args_or_df: Union[list, pd.DataFrame], target: np.ndarray
-    ) -> np.ndarray:
+    ) -> List[np.ndarray]:
+        """Returns the arguments of the function as a list with one array per
+        argument. DataFrame columns and the arrays of a list of arguments are used as
+        they are, without stacking them into one array, so that they are neither
+        copied nor upcast to a common dtype."""
         if isinstance(args_or_df, pd.DataFrame):
             for arg in self._arguments:
                 if arg not in args_or_df.columns:
@@ -349,16 +2179,37 @@ class OptimizableFunction:
                         f"Argument {arg} as specified in function was not found in "
                         f"DataFrame, which has columns {args_or_df.columns}"
                     )
-            args = args_or_df[self._arguments].values.swapaxes(0, -1)
-        else:
-            if target is None:
-                raise ValueError(
-                    "Unless first argument is DataFrame, target has to be set!"
-                )
-            args = np.array(args_or_df)
-        if args.ndim == 1:
-            args = args[None]
-        return args
+            return [args_or_df[arg].to_numpy(copy=False) for arg in self._arguments]
+        if target is None:
+            raise ValueError(
+                "Unless first argument is DataFrame, target has to be set!"
+            )
+        if (
+            isinstance(args_or_df, (list, tuple))
+            and len(args_or_df) > 0
+            and np.ndim(args_or_df[0]) > 0
+        ):
+            return [np.asarray(arg) for arg in args_or_df]
+        args = np.asarray(args_or_df)
+        return [args] if args.ndim == 1 else list(args)
+
+    def _load_inputs(
+        self,
+        args_or_df: Any,
+        target: Any,
+        weights: Any,
+        sigma: Any,
+    ) -> tuple:
+        """Resolves inputs on disk without copying them: Parquet files and Arrow
+        tables are read into DataFrames, of which only the needed columns are loaded,
+        and paths of .npy files are memory-mapped."""
+        target, weights, sigma = (load_array(v) for v in [target, weights, sigma])
+        if is_table(args_or_df):
+            names = [self._function.__name__ if target is None else target]
+            names += [weights, sigma]
+            columns = self._arguments + [c for c in names if isinstance(c, str)]
+            return load_table(args_or_df, columns), target, weights, sigma
+        return load_array(args_or_df), target, weights, sigma
 
     def _resolve_loss(self, loss: Union[str, BaseLoss]) -> BaseLoss:
         if isinstance(loss, BaseLoss):
@@ -409,3 +2260,73 @@ class OptimizableFunction:
         args = ", ".join(self._arguments)
         params = ", ".join(self._parameters)
         return f"<OptimizableFunction {self._name}({args}; {params})>"
+
+
+class _FitSetup:
+    """Everything a fit derives from its configuration rather than from the data."""
+
+    __slots__ = [
+        "parameters",
+        "loss",
+        "opt_config",
+        "solver",
+        "verbose",
+        "linear_parameters",
+        "nonlinear_parameters",
+        "cache_size",
+        "uncertainty",
+        "chunk_size",
+        "callback",
+        "callback_every",
+    ]
+
+    def __init__(
+        self,
+        parameters: Parameters,
+        loss: BaseLoss,
+        opt_config: Optional[dict],
+        solver: str,
+        verbose: bool,
+        linear_parameters: Optional[Parameters] = None,
+        nonlinear_parameters: Optional[Parameters] = None,
+        cache_size: int = 0,
+        uncertainty: str = "auto",
+        chunk_size: Optional[int] = None,
+        callback: Optional[Callable] = None,
+        callback_every: int = 1,
+    ):
+        self.parameters = parameters
+        self.loss = loss
+        self.opt_config = opt_config
+        self.solver = solver
+        self.verbose = verbose
+        self.linear_parameters = linear_parameters
+        self.nonlinear_parameters = nonlinear_parameters
+        self.cache_size = cache_size
+        self.uncertainty = uncertainty
+        self.chunk_size = chunk_size
+        self.callback = callback
+        self.callback_every = callback_every
+
+    def replace(self, **changes) -> "_FitSetup":
+        """Copy of the setup with some attributes replaced."""
+        setup = _FitSetup.__new__(_FitSetup)
+        for name in self.__slots__:
+            setattr(setup, name, changes.get(name, getattr(self, name)))
+        return setup
+
+    def with_start(self, x0: np.ndarray) -> "_FitSetup":
+        """Copy of the setup with the optimizer starting at `x0`."""
+        x0 = np.asarray(x0, dtype=float)
+        return self.replace(opt_config={**self.opt_config, "x0": x0})
+
+    def with_start_at(self, values: dict) -> "_FitSetup":
+        """Copy of the setup with the optimizer starting at the parameter `values`,
+        e.g. the result of a previous fit. With linear parameters, only the remaining
+        parameters are started there, since the linear ones are solved for."""
+        if self.opt_config is None:
+            return self
+        parameters = self.nonlinear_parameters or self.parameters
+        return self.with_start(
+            parameters.flatten(**{p: values[p] for p in parameters.params})
+        )
@@ -1,18 +1,24 @@
 import numpy as np
-from typing import Optional, Callable, Dict, Any, Union
+import pandas as pd
+from typing import Optional, Callable, Dict, Any, Union, List
 from inspect import getfullargspec
+from ._parameters import Parameters
+from ._stats import FitStats
 
 
 class ParameterValue:
-    __slots__ = ["value", "uncertainty"]
+    __slots__ = ["value", "uncertainty", "interval"]
 
     def __init__(
         self,
         value: Union[float, np.ndarray],
         uncertainty: Optional[Union[float, np.ndarray]] = None,
+        interval: Optional[tuple] = None,
     ):
         self.value = value
         self.uncertainty = uncertainty
+        # (lower, upper) bounds of a confidence interval, e.g. from a bootstrap.
+        self.interval = interval
 
     def __str__(self):
         out = f"{self.value}"
@@ -25,6 +31,35 @@ class ParameterValue:
 
 
 class OptimizationResult:
+    """Result of a fit. Parameters are accessed as attributes, e.g. `result.a.value`
+    and `result.a.uncertainty`.
+
+    Parameters
+    ----------
+    function: callable
+        The fitted function.
+    values: dict(str, float or np.ndarray)
+        Fitted values of all parameters.
+    function_value: float
+        Value of the loss at the optimum.
+    result: object
+        Result of the optimizer.
+    uncertainties: dict(str, float or np.ndarray), optional
+        Uncertainties of all parameters.
+    covariance: np.ndarray, optional
+        Covariance matrix of the flattened free parameters.
+    parameters: Parameters, optional
+        Layout of the free parameters within `covariance`.
+    gradient: callable, optional
+        Gradient of the function, see `optimizable`.
+    vectorized: bool
+        Whether the function broadcasts over a leading axis of its parameters.
+    refit: callable, optional
+        Fits the same function to new data, starting from this result, see `refit`.
+    stats: FitStats, optional
+        Evaluation counters and timings of the fit.
+    """
+
     def __init__(
         self,
         function: Callable,
@@ -32,6 +67,12 @@ class OptimizationResult:
         function_value: float,
         result: Any,
         uncertainties: Optional[Dict[str, float]] = None,
+        covariance: Optional[np.ndarray] = None,
+        parameters: Optional[Parameters] = None,
+        gradient: Optional[Callable] = None,
+        vectorized: bool = False,
+        refit: Optional[Callable] = None,
+        stats: Optional[FitStats] = None,
     ):
         self._function = function
         self._name = function.__name__
@@ -45,19 +86,264 @@ class OptimizationResult:
             p: ParameterValue(values[p], uncertainties.get(p, None)) for p in values
         }
         self.result = result
+        # Ensemble of fits, i.e. all distinct minima of a multi-start fit or the
+        # replicas of a bootstrap.
+        self.ensemble = None
+        self.covariance = covariance
+        self._layout = parameters
+        self._gradient = gradient
+        self._vectorized = vectorized
+        self._refit = refit
+        self.stats = stats
 
     def __getattr__(self, param):
+        if param.startswith("__") or param == "_fit_values":
+            raise AttributeError(param)
         return self._fit_values[param]
 
-    def __call__(self, *args):
+    def refit(
+        self,
+        args_or_df: Any,
+        target: Any = None,
+        weights: Any = None,
+        sigma: Any = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> "OptimizationResult":
+        """Fits the same function with the same loss and configuration to new data,
+        starting from this result. For BFGS, the inverse hessian of this result is
+        also passed on as the initial approximation, so that fits to slightly changed
+        data converge in a few iterations.
+
+        Parameters
+        ----------
+        args_or_df, target, weights, sigma
+            New data, see `OptimizableFunction.fit`.
+        options: dict, optional
+            Options that replace those of the original fit.
+
+        Returns
+        -------
+        OptimizationResult
+
+        Example
+        -------
+        >>> result = linear.fit(x, y, a=1.0, b=0.0)
+        ... result = result.refit(x_new, y_new)
+        """
+        if self._refit is None:
+            raise ValueError("This result cannot be refitted.")
+        return self._refit(args_or_df, target, weights, sigma, options)
+
+    @property
+    def correlation(self) -> Optional[np.ndarray]:
+        """Correlation matrix of the flattened free parameters."""
+        if self.covariance is None:
+            return None
+        sigma = np.sqrt(np.diag(self.covariance))
+        return self.covariance / np.outer(sigma, sigma)
+
+    def covariance_of(self, p: str, q: Optional[str] = None) -> np.ndarray:
+        """Covariance between the free parameters `p` and `q` (by default `p` itself),
+        of shape `p.shape + q.shape`.
+
+        Example
+        -------
+        >>> result = polynomial.fit(x, y, c=np.zeros(3))
+        ... result.covariance_of("c")  # 3x3 matrix
+        """
+        if self.covariance is None:
+            raise ValueError("No covariance available for this result.")
+        q = p if q is None else q
+        layout = self._layout
+        block = self.covariance[
+            np.ravel(layout.index_map[p])[:, None], np.ravel(layout.index_map[q])
+        ]
+        return block.reshape(tuple(layout.shapes[p]) + tuple(layout.shapes[q]))
+
+    def __call__(self, *args, uncertainty: bool = False):
+        """Evaluates the fitted function.
+
+        Parameters
+        ----------
+        args: iterable(float)
+            Arguments of the function.
+        uncertainty: bool
+            If True, the uncertainties of the free parameters are propagated to the
+            output using the covariance matrix and the jacobian of the function
+            output with respect to the parameters.
+
+        Returns
+        -------
+        np.ndarray or tuple(np.ndarray, np.ndarray)
+            Function output, and its uncertainty if `uncertainty` is True.
+        """
         args = np.array(args)
         if args.ndim == 1:
             args = args[None]
-        return self._function(
-            *args, **{k: v.value for k, v in self._fit_values.items()}
-        )
+        params = {k: v.value for k, v in self._fit_values.items()}
+        y_est = self._function(*args, **params)
+        if not uncertainty:
+            return y_est
+        if self.covariance is None:
+            raise ValueError("No covariance available for this result.")
+        jac = self._output_jacobian(args, params, y_est)
+        variance = np.einsum("...k,kl,...l->...", jac, self.covariance, jac)
+        return y_est, np.sqrt(variance)
+
+    def _output_jacobian(
+        self,
+        args: np.ndarray,
+        params: dict,
+        y_est: np.ndarray,
+        epsilon: float = 1.49e-8,
+    ) -> np.ndarray:
+        """Jacobian of the function output with respect to the flattened free
+        parameters, of shape `y_est.shape + (num_free_params,)`. Uses the gradient if
+        available and forward differences otherwise, with all steps evaluated in one
+        call if the function is vectorized."""
+        layout = self._layout
+        y_est = np.asarray(y_est)
+        if self._gradient is not None:
+            function_gradient = self._gradient(*args, **params)
+            blocks = []
+            for p in layout.params:
+                shape = tuple(layout.shapes[p]) + y_est.shape
+                derivative = np.broadcast_to(function_gradient[p], shape)
+                blocks.append(derivative.reshape((-1,) + y_est.shape))
+            return np.moveaxis(np.concatenate(blocks), 0, -1)
+
+        x = layout.flatten(**{p: params[p] for p in layout.params})
+        steps = epsilon * np.maximum(1.0, np.abs(x))
+        points = x + np.diag(steps)
+        if self._vectorized:
+            batch = {p: points[:, idx] for p, idx in layout.index_map.items()}
+            y_steps = self._function(*args, **{**params, **batch})
+        else:
+            y_steps = np.stack(
+                [
+                    self._function(*args, **{**params, **layout.unflatten(point)})
+                    for point in points
+                ]
+            )
+        steps = steps.reshape((-1,) + (1,) * y_est.ndim)
+        return np.moveaxis((y_steps - y_est) / steps, 0, -1)
 
     def __repr__(self):
         args = ", ".join(self._arguments)
         params = ", ".join([f"{k}={v}" for k, v in self._fit_values.items()])
         return f"<OptimizationResult {self._name}({args}; {params})>"
+
+
+class OptimizationResults:
+    """Columnar collection of the results of fitting one function to many datasets.
+
+    Parameter values and uncertainties are stored as arrays whose first axis runs over
+    the datasets. Missing uncertainties are stored as NaN. The covariance matrix of
+    every fit is kept in `covariances`, so that single results can propagate their
+    uncertainties.
+    """
+
+    def __init__(
+        self,
+        function: Callable,
+        values: Dict[str, np.ndarray],
+        function_values: np.ndarray,
+        results: List[Any],
+        uncertainties: Optional[Dict[str, np.ndarray]] = None,
+        covariances: Optional[List[Optional[np.ndarray]]] = None,
+        parameters: Optional[Parameters] = None,
+        gradient: Optional[Callable] = None,
+        vectorized: bool = False,
+    ):
+        self._function = function
+        self._name = function.__name__
+        argspecs = getfullargspec(function)
+        self._arguments = argspecs.args
+        self._parameters = argspecs.kwonlyargs
+        self.function_values = function_values
+        if uncertainties is None:
+            uncertainties = {}
+        self._fit_values = {
+            p: ParameterValue(values[p], uncertainties.get(p, None)) for p in values
+        }
+        self.results = results
+        if covariances is None:
+            covariances = [None] * len(results)
+        self.covariances = list(covariances)
+        self._layout = parameters
+        self._gradient = gradient
+        self._vectorized = vectorized
+
+    @property
+    def success(self) -> np.ndarray:
+        return np.array([getattr(r, "success", True) for r in self.results])
+
+    def __getattr__(self, param):
+        if param.startswith("__") or param == "_fit_values":
+            raise AttributeError(param)
+        return self._fit_values[param]
+
+    def __len__(self):
+        return len(self.results)
+
+    def __getitem__(self, i: int) -> OptimizationResult:
+        values = {p: v.value[i] for p, v in self._fit_values.items()}
+        uncertainties = {
+            p: (
+                None
+                if v.uncertainty is None or np.all(np.isnan(v.uncertainty[i]))
+                else v.uncertainty[i]
+            )
+            for p, v in self._fit_values.items()
+        }
+        return OptimizationResult(
+            self._function,
+            values,
+            self.function_values[i],
+            self.results[i],
+            uncertainties,
+            covariance=self.covariances[i],
+            parameters=self._layout,
+            gradient=self._gradient,
+            vectorized=self._vectorized,
+            stats=getattr(self.results[i], "stats", None),
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_frame(self, index: Optional[Any] = None) -> pd.DataFrame:
+        """Converts the results into a DataFrame with one row per fit.
+
+        Scalar parameters `p` are stored in the columns `p` and `p_uncertainty`,
+        array-shaped parameters get one pair of columns per entry, e.g. `p[0]` and
+        `p[0]_uncertainty`. The columns `loss` and `success` hold the function value
+        and whether the optimizer converged.
+
+        Parameters
+        ----------
+        index: array-like or pandas.Index, optional
+            Index of the DataFrame, e.g. the group keys.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        columns = {}
+        for p, v in self._fit_values.items():
+            value = np.asarray(v.value)
+            uncertainty = v.uncertainty
+            if uncertainty is None:
+                uncertainty = np.full(value.shape, np.nan)
+            for idx in np.ndindex(value.shape[1:]):
+                name = p if idx == () else f"{p}[{','.join(map(str, idx))}]"
+                columns[name] = value[(slice(None),) + idx]
+                columns[f"{name}_uncertainty"] = uncertainty[(slice(None),) + idx]
+        columns["loss"] = self.function_values
+        columns["success"] = self.success
+        return pd.DataFrame(columns, index=index)
+
+    def __repr__(self):
+        args = ", ".join(self._arguments)
+        params = ", ".join(self._fit_values)
+        return f"<OptimizationResults {self._name}({args}; {params}) x {len(self)}>"
@@ -0,0 +1,173 @@
+"""
+Process pool execution of many independent fits. The optimizable function and the fit
+setup are shipped to every worker once when the pool starts, so that tasks only carry
+their datasets, or, for fits of one dataset from many starting points, only the
+starting points.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, List, Optional
+import numpy as np
+
+_worker_state = {}
+
+
+def _init_worker(optimizable_function: Any, setup: Any, data: Optional[tuple] = None):
+    _worker_state["optimizable_function"] = optimizable_function
+    _worker_state["setup"] = setup
+    _worker_state["data"] = data
+
+
+def _fit_in_worker(dataset: Any) -> tuple:
+    return _worker_state["optimizable_function"]._fit_dataset(
+        _worker_state["setup"], dataset
+    )
+
+
+def _fit_start_in_worker(x0: np.ndarray) -> tuple:
+    return _worker_state["optimizable_function"]._fit_prepared(
+        _worker_state["setup"].with_start(x0), *_worker_state["data"]
+    )
+
+
+def fit_in_pool(
+    optimizable_function: Any,
+    setup: Any,
+    datasets: Iterable[Any],
+    n_jobs: Optional[int] = None,
+    chunksize: int = 1,
+) -> List[tuple]:
+    """Fits every dataset in a pool of `n_jobs` processes.
+
+    Parameters
+    ----------
+    optimizable_function: OptimizableFunction
+        Function to fit. Has to be picklable, i.e. defined at module level.
+    setup: _FitSetup
+        Fit setup shared by all datasets.
+    datasets: iterable
+        Datasets as accepted by `OptimizableFunction.fit_many`.
+    n_jobs: int, optional
+        Number of worker processes. If None, the number of CPUs is used.
+    chunksize: int
+        Number of datasets that are sent to a worker at once.
+
+    Returns
+    -------
+    list(tuple)
+        Fit values, uncertainties, function value and raw result per dataset, in the
+        order of `datasets`.
+    """
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=(optimizable_function, setup),
+    ) as executor:
+        return list(executor.map(_fit_in_worker, datasets, chunksize=chunksize))
+
+
+def _fit_resample_in_worker(seed: int) -> tuple:
+    return _worker_state["optimizable_function"]._fit_resample(
+        _worker_state["setup"], _worker_state["data"], seed
+    )
+
+
+def _map_with_data(
+    worker: Any,
+    optimizable_function: Any,
+    setup: Any,
+    data: tuple,
+    tasks: Iterable[Any],
+    n_jobs: Optional[int],
+    chunksize: int,
+) -> List[tuple]:
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=(optimizable_function, setup, data),
+    ) as executor:
+        return list(executor.map(worker, tasks, chunksize=chunksize))
+
+
+def fit_starts_in_pool(
+    optimizable_function: Any,
+    setup: Any,
+    data: tuple,
+    starts: np.ndarray,
+    n_jobs: Optional[int] = None,
+    chunksize: int = 1,
+) -> List[tuple]:
+    """Fits one dataset from every starting point in a pool of `n_jobs` processes.
+    The prepared dataset is sent to every worker once.
+
+    Parameters
+    ----------
+    optimizable_function: OptimizableFunction
+        Function to fit. Has to be picklable, i.e. defined at module level.
+    setup: _FitSetup
+        Fit setup shared by all starting points.
+    data: tuple
+        Prepared `(args, target, weights, sigma)`.
+    starts: np.ndarray
+        Flat starting points of shape (n_starts, k).
+    n_jobs: int, optional
+        Number of worker processes. If None, the number of CPUs is used.
+    chunksize: int
+        Number of starting points that are sent to a worker at once.
+
+    Returns
+    -------
+    list(tuple)
+        Fit values, uncertainties, function value and raw result per starting point.
+    """
+    return _map_with_data(
+        _fit_start_in_worker,
+        optimizable_function,
+        setup,
+        data,
+        starts,
+        n_jobs,
+        chunksize,
+    )
+
+
+def fit_resamples_in_pool(
+    optimizable_function: Any,
+    setup: Any,
+    data: tuple,
+    seeds: Iterable[int],
+    n_jobs: Optional[int] = None,
+    chunksize: int = 1,
+) -> List[tuple]:
+    """Fits bootstrap resamples of one dataset in a pool of `n_jobs` processes. The
+    prepared dataset is sent to every worker once, and every task only carries the
+    seed from which the worker draws its resample.
+
+    Parameters
+    ----------
+    optimizable_function: OptimizableFunction
+        Function to fit. Has to be picklable, i.e. defined at module level.
+    setup: _FitSetup
+        Fit setup shared by all resamples.
+    data: tuple
+        Prepared `(args, target, weights, sigma)`.
+    seeds: iterable(int)
+        One seed per resample.
+    n_jobs: int, optional
+        Number of worker processes. If None, the number of CPUs is used.
+    chunksize: int
+        Number of resamples that are sent to a worker at once.
+
+    Returns
+    -------
+    list(tuple)
+        Fit values, uncertainties, function value and raw result per resample.
+    """
+    return _map_with_data(
+        _fit_resample_in_worker,
+        optimizable_function,
+        setup,
+        data,
+        seeds,
+        n_jobs,
+        chunksize,
+    )
@@ -5,18 +5,45 @@ class Parameters:
     def __init__(self, **shapes):
         self.shapes = shapes
         self.index_map = {}
+        self.slices = {}
         counter = 0
         for k, v in shapes.items():
-            n_params = np.prod(v)
+            n_params = int(np.prod(v))
             idx = np.arange(n_params) + counter
             if not v == ():
                 idx = idx.reshape(v)
             self.index_map[k] = idx.astype(int)
+            self.slices[k] = slice(counter, counter + n_params)
             counter += n_params
         self.params = list(self.index_map.keys())
+        self.size = counter
+        # Scalars are looked up by position, arrays as reshaped views of a slice.
+        self._layout = [
+            (k, self.slices[k].start if v == () else self.slices[k], v)
+            for k, v in shapes.items()
+        ]
 
     def flatten(self, **params):
-        return np.concatenate([np.asarray(v).flatten() for k, v in params.items()])
+        """Writes all parameters into a new flat array. Raises a KeyError unless
+        exactly the parameters of the layout are given."""
+        if params.keys() != self.index_map.keys():
+            missing = [k for k in self.params if k not in params]
+            unknown = [k for k in params if k not in self.index_map]
+            raise KeyError(
+                f"Expected parameters {self.params}, but {missing} are missing and "
+                f"{unknown} are unknown."
+            )
+        out = np.empty(self.size)
+        for k, v in params.items():
+            out[self.slices[k]] = np.ravel(v)
+        return out
 
-    def unflatten(self, params):
-        return {k: params[idx] for k, idx in self.index_map.items()}
+    def unflatten(self, params, out=None):
+        """Splits a flat array into a dictionary of parameters. Scalar parameters are
+        returned as floats, array parameters as views into `params`. If `out` is
+        given, the parameters are written into that dictionary instead."""
+        if out is None:
+            out = {}
+        for k, s, shape in self._layout:
+            out[k] = float(params[s]) if shape == () else params[s].reshape(shape)
+        return out
@@ -0,0 +1,126 @@
+"""
+Batched Levenberg-Marquardt solver for many independent least squares problems with
+the same number of parameters. The problems are stacked along a leading axis, so that
+the jacobian is block-diagonal and every Gauss-Newton step is a batch of small linear
+systems solved with a single call to `np.linalg.solve`.
+"""
+import numpy as np
+from typing import Callable, Optional, Tuple
+
+
+def forward_difference_jacobian(
+    residuals: Callable, x: np.ndarray, r: np.ndarray, epsilon: float = 1.49e-8
+) -> np.ndarray:
+    """Jacobian of stacked residuals via forward differences. Every parameter is
+    perturbed in all problems at once, which costs one evaluation per parameter.
+
+    Parameters
+    ----------
+    residuals: callable
+        Maps parameters of shape (N, k) to residuals of shape (N, n).
+    x: np.ndarray
+        Parameters of shape (N, k).
+    r: np.ndarray
+        Residuals at `x`.
+    epsilon: float
+        Relative step size.
+
+    Returns
+    -------
+    np.ndarray
+        Jacobian of shape (N, n, k).
+    """
+    jac = np.empty(r.shape + (x.shape[1],))
+    for j in range(x.shape[1]):
+        step = epsilon * np.maximum(1.0, np.abs(x[:, j]))
+        x_step = x.copy()
+        x_step[:, j] += step
+        jac[:, :, j] = (residuals(x_step) - r) / step[:, None]
+    return jac
+
+
+def levenberg_marquardt(
+    residuals: Callable,
+    x0: np.ndarray,
+    jacobian: Optional[Callable] = None,
+    maxiter: int = 100,
+    ftol: float = 1e-10,
+    xtol: float = 1e-10,
+    verbose: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    """Minimizes `0.5 * sum(residuals(x) ** 2, axis=1)` for every problem.
+
+    Parameters
+    ----------
+    residuals: callable
+        Maps parameters of shape (N, k) to residuals of shape (N, n).
+    x0: np.ndarray
+        Initial parameters of shape (N, k).
+    jacobian: callable, optional
+        Maps parameters and residuals to the jacobian of shape (N, n, k). Defaults to
+        forward differences.
+    maxiter: int
+        Maximum number of iterations.
+    ftol: float
+        Tolerance on the relative decrease of the cost.
+    xtol: float
+        Tolerance on the relative size of the step.
+    verbose: bool
+        Whether to print the progress after every iteration.
+
+    Returns
+    -------
+    x: np.ndarray
+        Solutions of shape (N, k).
+    cost: np.ndarray
+        Cost per problem.
+    jac: np.ndarray
+        Jacobian at the solutions.
+    success: np.ndarray
+        Whether the problem converged.
+    nit: int
+        Number of iterations.
+    """
+    if jacobian is None:
+
+        def jacobian(x, r):
+            return forward_difference_jacobian(residuals, x, r)
+
+    x = np.array(x0, dtype=float)
+    r = residuals(x)
+    cost = 0.5 * np.sum(r**2, axis=1)
+    jac = jacobian(x, r)
+    damping = np.full(len(x), 1e-3)
+    active = np.ones(len(x), dtype=bool)
+    nit = 0
+    for nit in range(1, maxiter + 1):
+        jtj = np.einsum("nik,nil->nkl", jac, jac)
+        jtr = np.einsum("nik,ni->nk", jac, r)
+        diagonal = np.einsum("nkk->nk", jtj)
+        system = jtj + np.einsum(
+            "nk,kl->nkl", damping[:, None] * diagonal + 1e-12, np.eye(x.shape[1])
+        )
+        step = -np.linalg.solve(system, jtr[..., None])[..., 0]
+        step[~active] = 0.0
+
+        x_new = x + step
+        r_new = residuals(x_new)
+        cost_new = 0.5 * np.sum(r_new**2, axis=1)
+        improved = active & (cost_new < cost)
+        small_decrease = cost - cost_new <= ftol * cost
+        small_step = np.linalg.norm(step, axis=1) <= xtol * (
+            np.linalg.norm(x, axis=1) + xtol
+        )
+
+        x[improved] = x_new[improved]
+        r[improved] = r_new[improved]
+        damping = np.where(improved, damping / 10.0, damping * 10.0)
+        active &= ~((improved & small_decrease) | small_step)
+        cost = np.where(improved, cost_new, cost)
+        if verbose:
+            print(f"Iteration {nit}: {active.sum()} active, mean cost {cost.mean()}")
+        if not active.any():
+            break
+        jac = jacobian(x, r)
+
+    return x, cost, jac, ~active, nit
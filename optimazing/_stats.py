@@ -0,0 +1,75 @@
+"""
+Evaluation counters and timings of a fit. Stages of the fit are timed as a whole, and
+the function, its gradient and the loss are wrapped individually while the solver runs,
+which costs two calls of `time.perf_counter` per evaluation.
+"""
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Dict
+
+EVALUATIONS = ["model", "gradient", "loss", "loss_gradient"]
+STAGES = ["prepare", "setup", "solver", "optimizer", "uncertainty"]
+
+
+class FitStats:
+    """Evaluation counters and timings of a fit, in seconds.
+
+    Attributes
+    ----------
+    evaluations: dict(str, int)
+        Number of evaluations by the solver of
+        * "model": the function,
+        * "gradient": the gradient of the function with respect to the parameters,
+        * "loss": the loss,
+        * "loss_gradient": the gradient of the loss.
+        With `chunk_size`, every block counts as one evaluation.
+    times: dict(str, float)
+        Time spent in the evaluations above, and in the stages
+        * "prepare": loading and checking the inputs,
+        * "setup": resolving the loss, the parameters and the optimizer options,
+        * "solver": the solver, including all evaluations,
+        * "optimizer": the solver itself, i.e. without the evaluations above,
+        * "uncertainty": estimating the inverse hessian, unless taken from the
+          optimizer.
+    """
+
+    __slots__ = ["evaluations", "times"]
+
+    def __init__(self):
+        self.evaluations: Dict[str, int] = {e: 0 for e in EVALUATIONS}
+        self.times: Dict[str, float] = {t: 0.0 for t in EVALUATIONS + STAGES}
+
+    def timed(self, kind: str, function: Callable) -> Callable:
+        """Wraps `function` to count its evaluations and time them as `kind`."""
+        evaluations = self.evaluations
+        times = self.times
+
+        def _timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[kind] += perf_counter() - start
+                evaluations[kind] += 1
+
+        return _timed
+
+    @contextmanager
+    def stage(self, name: str):
+        """Adds the time spent in the context to stage `name`."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += perf_counter() - start
+
+    def finish_solver(self):
+        """Attributes the time of the solver that was not spent in evaluations to the
+        optimizer."""
+        evaluation_time = sum(self.times[e] for e in EVALUATIONS)
+        self.times["optimizer"] = max(self.times["solver"] - evaluation_time, 0.0)
+
+    def __repr__(self):
+        evaluations = ", ".join(f"{e}={n}" for e, n in self.evaluations.items())
+        times = ", ".join(f"{t}={s:.3g}s" for t, s in self.times.items())
+        return f"<FitStats {evaluations}; {times}>"
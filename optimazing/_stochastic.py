@@ -0,0 +1,227 @@
+"""
+Stochastic optimizers for datasets that do not fit into memory. The loss is minimized
+batch by batch, so that only one batch has to be held in memory at a time. Every
+optimizer is a factory that returns a step function
+step(x, objective) -> (x_new, value, nfev)
+where `objective` maps parameters to the loss of the current batch and its gradient.
+A step function may have an attribute `end_epoch(x)`, which is called after every
+epoch with the current parameters.
+"""
+import numpy as np
+from collections import deque
+from typing import Callable, Iterable, Optional, Tuple
+from scipy.optimize import OptimizeResult
+
+
+def forward_difference_gradient(
+    function: Callable, x: np.ndarray, epsilon: float = 1.49e-8
+) -> Tuple[float, np.ndarray]:
+    """Value and gradient of a scalar function via forward differences."""
+    value = function(x)
+    gradient = np.empty(len(x))
+    for j in range(len(x)):
+        step = epsilon * max(1.0, abs(x[j]))
+        x_step = x.copy()
+        x_step[j] += step
+        gradient[j] = (function(x_step) - value) / step
+    return value, gradient
+
+
+def _sgd(
+    lower: np.ndarray,
+    upper: np.ndarray,
+    learning_rate: float = 1e-2,
+    momentum: float = 0.9,
+) -> Callable:
+    velocity = np.zeros(len(lower))
+
+    def step(x, objective):
+        value, gradient = objective(x)
+        velocity[:] = momentum * velocity - learning_rate * gradient
+        return np.clip(x + velocity, lower, upper), value, 1
+
+    return step
+
+
+def _adam(
+    lower: np.ndarray,
+    upper: np.ndarray,
+    learning_rate: float = 1e-3,
+    beta1: float = 0.9,
+    beta2: float = 0.999,
+    epsilon: float = 1e-8,
+) -> Callable:
+    first_moment = np.zeros(len(lower))
+    second_moment = np.zeros(len(lower))
+    counter = [0]
+
+    def step(x, objective):
+        value, gradient = objective(x)
+        counter[0] += 1
+        first_moment[:] = beta1 * first_moment + (1.0 - beta1) * gradient
+        second_moment[:] = beta2 * second_moment + (1.0 - beta2) * gradient**2
+        m = first_moment / (1.0 - beta1 ** counter[0])
+        v = second_moment / (1.0 - beta2 ** counter[0])
+        x_new = x - learning_rate * m / (np.sqrt(v) + epsilon)
+        return np.clip(x_new, lower, upper), value, 1
+
+    return step
+
+
+def _lbfgs(
+    lower: np.ndarray,
+    upper: np.ndarray,
+    learning_rate: float = 0.1,
+    decay: float = 0.1,
+    memory: int = 10,
+) -> Callable:
+    """Stochastic L-BFGS. Every batch takes a step of `learning_rate` along the
+    quasi-Newton direction of its gradient. The curvature pairs are measured along one
+    direction per epoch (the change of the parameters over the previous epoch) and
+    averaged over all batches of the epoch, so that they describe the full loss rather
+    than single batches. The inverse hessian approximation is only updated between
+    epochs, so every epoch applies the same preconditioner to all batches, and the
+    learning rate decays as `learning_rate / (1 + decay * epoch)`."""
+    pairs = deque(maxlen=memory)
+    state = {"epoch": 0, "start": None, "s": None, "y": None, "batches": 0}
+
+    def direction(gradient):
+        q = gradient.copy()
+        alphas = []
+        for s, y in reversed(pairs):
+            alphas.append(s @ q / (s @ y))
+            q -= alphas[-1] * y
+        q *= state["scale"]
+        for (s, y), alpha in zip(pairs, reversed(alphas)):
+            q += (alpha - y @ q / (s @ y)) * s
+        return -q
+
+    def step(x, objective):
+        value, gradient = objective(x)
+        if state["start"] is None:
+            state["start"] = x.copy()
+        if state["s"] is None:
+            # Before the first epoch, the curvature is probed along a small gradient
+            # step, which also sets the initial scale of the inverse hessian.
+            norm = max(np.linalg.norm(gradient), np.finfo(float).tiny)
+            state["s"] = -gradient * 1e-4 * max(1.0, np.linalg.norm(x)) / norm
+        y = objective(x + state["s"])[1] - gradient
+        state["y"] = y if state["y"] is None else state["y"] + y
+        state["batches"] += 1
+        if "scale" not in state:
+            sy = state["s"] @ y
+            state["scale"] = sy / (y @ y) if sy > 0 else 1.0
+
+        rate = learning_rate / (1.0 + decay * state["epoch"])
+        return np.clip(x + rate * direction(gradient), lower, upper), value, 2
+
+    def end_epoch(x):
+        s, y = state["s"], state["y"] / state["batches"]
+        if s @ y > 1e-10 * np.sqrt((s @ s) * (y @ y)):
+            pairs.append((s, y))
+            state["scale"] = s @ y / (y @ y)
+        s = x - state["start"]
+        if np.any(s):
+            state["s"] = s
+        state.update(epoch=state["epoch"] + 1, start=None, y=None, batches=0)
+
+    step.end_epoch = end_epoch
+    return step
+
+
+STOCHASTIC_OPTIMIZERS = {"sgd": _sgd, "adam": _adam, "lbfgs": _lbfgs}
+
+
+def stochastic_minimize(
+    batches: Callable[[], Iterable[Callable]],
+    x0: np.ndarray,
+    optimizer: str = "adam",
+    epochs: int = 1,
+    bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    tol: Optional[float] = None,
+    verbose: bool = False,
+    **options,
+) -> OptimizeResult:
+    """Minimizes a loss that is given batch by batch.
+
+    Parameters
+    ----------
+    batches: callable
+        Returns an iterable over the objectives of all batches for one epoch. Every
+        objective maps parameters to the loss of the batch and its gradient.
+    x0: np.ndarray
+        Initial parameters.
+    optimizer: str
+        One of
+        * "adam": Adam with options `learning_rate` (1e-3), `beta1`, `beta2` and
+          `epsilon`.
+        * "sgd": Stochastic gradient descent with options `learning_rate` (1e-2) and
+          `momentum` (0.9).
+        * "lbfgs": Stochastic L-BFGS with options `learning_rate` (0.1), `decay`
+          (0.1) and `memory` (10), which preconditions the steps on every batch with
+          curvature pairs of the full loss, measured across the batches of every
+          epoch. Costs two gradient evaluations per batch.
+    epochs: int
+        Maximum number of passes over all batches.
+    bounds: tuple(np.ndarray, np.ndarray), optional
+        Lower and upper bounds, parameters are clipped to those after every step.
+    tol: float, optional
+        Stop once the mean batch loss of an epoch changes by less than this fraction.
+    verbose: bool
+        Whether to print the mean batch loss after every epoch.
+
+    Returns
+    -------
+    scipy.optimize.OptimizeResult
+        With `fun` being the mean batch loss of the last epoch.
+    """
+    if optimizer not in STOCHASTIC_OPTIMIZERS:
+        raise ValueError(
+            f"Unknown optimizer '{optimizer}', has to be one of "
+            f"{list(STOCHASTIC_OPTIMIZERS)}."
+        )
+    x = np.array(x0, dtype=float)
+    if bounds is None:
+        bounds = (np.full(len(x), -np.inf), np.full(len(x), np.inf))
+    step = STOCHASTIC_OPTIMIZERS[optimizer](*bounds, **options)
+    end_epoch = getattr(step, "end_epoch", None)
+
+    fun = previous = None
+    nit = nfev = epoch = 0
+    converged = False
+    for epoch in range(1, epochs + 1):
+        values = []
+        for objective in batches():
+            x, value, n = step(x, objective)
+            values.append(value)
+            nfev += n
+        if len(values) == 0:
+            raise ValueError(
+                f"No batches left in epoch {epoch}. For more than one epoch, pass a "
+                "callable that returns a new iterable over the batches."
+            )
+        nit += len(values)
+        if end_epoch is not None:
+            end_epoch(x)
+        fun = np.mean(values)
+        if verbose:
+            print(f"Epoch {epoch}: mean batch loss {fun}")
+        if tol is not None and previous is not None:
+            if abs(previous - fun) <= tol * abs(previous):
+                converged = True
+                break
+        previous = fun
+
+    return OptimizeResult(
+        x=x,
+        fun=fun,
+        success=converged or tol is None,
+        message=(
+            f"Converged after {epoch} epochs."
+            if converged
+            else f"Finished {epoch} epochs."
+        ),
+        nit=nit,
+        nfev=nfev,
+        nepochs=epoch,
+    )
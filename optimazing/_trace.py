@@ -0,0 +1,168 @@
+"""
+Callbacks on the iterates of the solver. A callback is any callable
+callback(params, loss, elapsed)
+that receives the free parameters as a dictionary, the value of the loss and the
+seconds since the solver started. It is only called for the iterates the solver
+accepts, not for finite difference probes or trial points of line searches.
+`TraceRecorder` is a callback that keeps the most recent iterates in a preallocated
+ring buffer.
+"""
+import numpy as np
+import pandas as pd
+from time import perf_counter
+from typing import Callable, Optional
+from ._parameters import Parameters
+
+
+def iteration_callback(
+    parameters: Parameters,
+    callback: Callable,
+    every: int = 1,
+    loss_at: Optional[Callable] = None,
+) -> Callable:
+    """Adapts `callback` to the `callback` argument of `scipy.optimize.minimize` and
+    `scipy.optimize.least_squares`, passing on every `every`-th iterate.
+
+    Parameters
+    ----------
+    parameters: Parameters
+        Layout of the flat parameters.
+    callback: callable
+        Called as `callback(params, loss, elapsed)`.
+    every: int
+        Sampling rate, only every `every`-th iterate is passed on. Iterates in between
+        only cost a counter increment.
+    loss_at: callable, optional
+        Loss at the flat parameters, for solvers that only pass the iterate itself,
+        like "TNC". This costs an extra evaluation per reported iterate.
+
+    Returns
+    -------
+    callable
+        Solver callback that takes the intermediate result.
+    """
+    start = perf_counter()
+    counter = [0]
+
+    # The argument has to be named `intermediate_result` for scipy to pass an
+    # OptimizeResult rather than the bare iterate.
+    def _callback(intermediate_result):
+        counter[0] += 1
+        if counter[0] % every != 0:
+            return
+        if isinstance(intermediate_result, np.ndarray):
+            x = intermediate_result
+            loss = loss_at(x)
+        elif "cost" in intermediate_result:
+            # least_squares reports half the sum of squared residuals
+            x = intermediate_result.x
+            loss = 2.0 * intermediate_result.cost / intermediate_result.fun.size
+        else:
+            x = intermediate_result.x
+            loss = intermediate_result.fun
+        callback(
+            parameters.unflatten(np.array(x, dtype=float)),
+            float(loss),
+            perf_counter() - start,
+        )
+
+    return _callback
+
+
+class TraceRecorder:
+    """Callback that records the optimization path in a ring buffer.
+
+    The buffer is a NumPy array that is allocated once, at the first iterate, with
+    `capacity` rows of the elapsed time, the loss and the flat parameters of an
+    iterate. Once it is full, the oldest rows are overwritten, so that a recorder can
+    be attached to long fits with constant memory and without any I/O.
+
+    Parameters
+    ----------
+    capacity: int
+        Maximum number of iterates that are kept.
+
+    Attributes
+    ----------
+    count: int
+        Number of iterates recorded so far, including overwritten ones.
+
+    Example
+    -------
+    >>> trace = TraceRecorder(capacity=10000)
+    ... linear.fit(x, y, callback=trace, callback_every=10, a=1.0, b=0.0)
+    ... trace.to_frame()
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError(f"Capacity has to be positive, but found {capacity}.")
+        self.capacity = capacity
+        self.count = 0
+        self._buffer = None
+        self._layout = None
+
+    def __call__(self, params: dict, loss: float, elapsed: float):
+        if self._buffer is None:
+            self._layout = Parameters(**{p: np.shape(v) for p, v in params.items()})
+            self._buffer = np.empty((self.capacity, 2 + self._layout.size))
+        row = self._buffer[self.count % self.capacity]
+        row[0] = elapsed
+        row[1] = loss
+        for p, v in params.items():
+            row[2:][self._layout.slices[p]] = np.ravel(v)
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def trace(self) -> np.ndarray:
+        """Recorded rows in chronological order, with the elapsed time in the first
+        column, the loss in the second and the flat parameters in the remaining."""
+        if self._buffer is None:
+            return np.empty((0, 2))
+        if self.count <= self.capacity:
+            return self._buffer[: self.count].copy()
+        return np.roll(self._buffer, -(self.count % self.capacity), axis=0)
+
+    @property
+    def elapsed(self) -> np.ndarray:
+        """Seconds since the start of the solver of every recorded iterate."""
+        return self.trace[:, 0]
+
+    @property
+    def loss(self) -> np.ndarray:
+        """Loss of every recorded iterate."""
+        return self.trace[:, 1]
+
+    @property
+    def parameters(self) -> dict:
+        """Dictionary of every parameter with the recorded iterates along the
+        first axis."""
+        if self._layout is None:
+            return {}
+        flat = self.trace[:, 2:]
+        return {
+            p: flat[:, self._layout.slices[p]].reshape((-1,) + shape)
+            for p, shape in self._layout.shapes.items()
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """Recorded iterates as a DataFrame with columns "elapsed", "loss" and one
+        column per parameter coordinate, e.g. "c[0]" for array parameters."""
+        columns = ["elapsed", "loss"]
+        if self._layout is not None:
+            for p, shape in self._layout.shapes.items():
+                if shape == ():
+                    columns.append(p)
+                else:
+                    columns += [f"{p}{list(i)}" for i in np.ndindex(*shape)]
+        return pd.DataFrame(self.trace, columns=columns)
+
+    def clear(self):
+        """Forgets all recorded iterates, keeping the buffer."""
+        self.count = 0
+
+    def __repr__(self):
+        return f"<TraceRecorder {len(self)}/{self.capacity} iterates>"
@@ -0,0 +1,79 @@
+"""
+Uncertainty estimation independent of the optimizer, via the inverse hessian of the
+loss at the optimum, the same quantity scipy.optimize.minimize reports as `hess_inv` for
+BFGS. The parameter covariance is that inverse hessian scaled by the likelihood factor
+of the loss over the number of data points.
+"""
+import numpy as np
+from typing import Callable
+
+
+def hessian_stencil(x: np.ndarray, epsilon: float = 1e-4) -> np.ndarray:
+    """Points at which the objective has to be evaluated for a central difference
+    hessian at `x`.
+
+    Parameters
+    ----------
+    x: np.ndarray
+        Flat parameters of length k.
+    epsilon: float
+        Relative step size.
+
+    Returns
+    -------
+    np.ndarray
+        Points of shape (1 + 2k + 2k(k - 1), k): the center, the two points along
+        every axis and the four diagonal points for every pair of axes.
+    """
+    k = len(x)
+    steps = np.diag(epsilon * np.maximum(1.0, np.abs(x)))
+    rows, cols = np.triu_indices(k, 1)
+    offsets = [np.zeros((1, k)), steps, -steps]
+    for sign_i, sign_j in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
+        offsets.append(sign_i * steps[rows] + sign_j * steps[cols])
+    return x + np.concatenate(offsets)
+
+
+def numerical_hessian(
+    objective: Callable, x: np.ndarray, epsilon: float = 1e-4
+) -> np.ndarray:
+    """Hessian of a scalar objective via central differences.
+
+    Parameters
+    ----------
+    objective: callable
+        Maps points of shape (M, k) to objective values of shape (M,), so that all
+        points of the stencil can be evaluated in a single batch.
+    x: np.ndarray
+        Flat parameters of length k.
+    epsilon: float
+        Relative step size.
+
+    Returns
+    -------
+    np.ndarray
+        Hessian of shape (k, k).
+    """
+    x = np.asarray(x, dtype=float)
+    k = len(x)
+    h = epsilon * np.maximum(1.0, np.abs(x))
+    values = np.asarray(objective(hessian_stencil(x, epsilon)), dtype=float)
+    center, plus, minus, pairs = np.split(values, [1, k + 1, 2 * k + 1])
+    hessian = np.diag((plus - 2.0 * center + minus) / h**2)
+
+    rows, cols = np.triu_indices(k, 1)
+    n_pairs = len(rows)
+    pp, pm, mp, mm = pairs.reshape(4, n_pairs)
+    off_diagonal = (pp - pm - mp + mm) / (4.0 * h[rows] * h[cols])
+    hessian[rows, cols] = off_diagonal
+    hessian[cols, rows] = off_diagonal
+    return hessian
+
+
+def inverse_hessian(hessian: np.ndarray) -> np.ndarray:
+    """Pseudo-inverse of a hessian. Negative variances, which occur if the hessian is
+    not positive definite, are set to NaN."""
+    hess_inv = np.linalg.pinv(hessian)
+    diagonal = np.einsum("ii->i", hess_inv)
+    diagonal[diagonal < 0] = np.nan
+    return hess_inv
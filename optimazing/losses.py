@@ -6,9 +6,27 @@ loss(
     weights: np.ndarray,
     sigma: np.ndarray
 ) -> float
+
+Optionally, a loss can be given a gradient with the same signature that returns the
+derivative of the loss with respect to `y_est`, which allows `fit` to pass an exact
+jacobian to the optimizer.
+
+Since `y_true`, `weights` and `sigma` do not change during a fit, a loss can also be
+given a prepare step
+prepare(y_true, weights, sigma) -> Callable[[np.ndarray], float]
+that precomputes everything that only depends on them and returns the loss as a
+function of `y_est` alone. The same holds for the gradient.
+
+Parameter covariances are derived from the inverse hessian of the loss, which requires
+to know how the loss relates to a likelihood: the `likelihood_factor` f of a loss is
+such that N times the loss (for N data points) equals f times the negative log
+likelihood, up to a constant. It is 2 for chi squared and 1 for the Laplace and Poisson
+losses.
 """
 import numpy as np
 from inspect import getfullargspec
+from importlib import import_module
+from functools import partial
 from abc import ABC
 from typing import Callable, Optional, Dict
 
@@ -33,9 +51,33 @@ class _DictWithGetAttr:
 _losses = _DictWithGetAttr()
 
 
-def loss(func: Optional[Callable] = None, *, register: Optional[bool] = False):
+def loss(
+    func: Optional[Callable] = None,
+    *,
+    register: Optional[bool] = False,
+    gradient: Optional[Callable] = None,
+    prepare: Optional[Callable] = None,
+    prepare_gradient: Optional[Callable] = None,
+    likelihood_factor: float = 2.0,
+):
+    hooks = dict(
+        gradient=gradient,
+        prepare=prepare,
+        prepare_gradient=prepare_gradient,
+        likelihood_factor=likelihood_factor,
+    )
+
     def _decorator(func: Callable):
-        """Turns a function into a BaseLoss"""
+        """Turns a function into a BaseLoss.
+
+        If `gradient` is given, it has to share the signature of the loss and return
+        the derivative of the loss with respect to `y_est`. If `prepare` (or
+        `prepare_gradient`) is given, it is called as prepare(y_true, weights, sigma)
+        with the parameters of the loss and has to return the loss (or its gradient)
+        as a function of `y_est` only. `likelihood_factor` relates the loss to a
+        negative log likelihood, see the module docstring. The default of 2 holds for
+        losses that are a mean of squared normalized residuals.
+        """
         argspecs = getfullargspec(func)
         if argspecs.args != ["y_true", "y_est", "weights", "sigma"]:
             raise ValueError(
@@ -46,10 +88,44 @@ def loss(func: Optional[Callable] = None, *, register: Optional[bool] = False):
         class Loss(BaseLoss):
             def __init__(self, **kwargs):
                 super().__init__(func.__name__, **kwargs)
+                self.likelihood_factor = likelihood_factor
+
+            @property
+            def has_gradient(self) -> bool:
+                return gradient is not None
 
             def function(self, y_true, y_est, weights, sigma, **kwargs):
                 return func(y_true, y_est, weights, sigma, **kwargs)
 
+            def gradient_function(self, y_true, y_est, weights, sigma, **kwargs):
+                if gradient is None:
+                    return super().gradient_function(y_true, y_est, weights, sigma)
+                return gradient(y_true, y_est, weights, sigma, **kwargs)
+
+            def bind(self) -> Callable:
+                return partial(func, **self.params) if self.params else func
+
+            def bind_gradient(self) -> Callable:
+                if gradient is None:
+                    return super().bind_gradient()
+                return partial(gradient, **self.params) if self.params else gradient
+
+            def prepare(self, y_true, weights, sigma) -> Callable:
+                if prepare is None:
+                    return super().prepare(y_true, weights, sigma)
+                return prepare(y_true, weights, sigma, **self.params)
+
+            def prepare_gradient(self, y_true, weights, sigma) -> Callable:
+                if prepare_gradient is None:
+                    return super().prepare_gradient(y_true, weights, sigma)
+                return prepare_gradient(y_true, weights, sigma, **self.params)
+
+            def __reduce__(self):
+                # The class is local to the decorator, so losses are pickled (e.g. to
+                # ship them to worker processes) by looking them up by name.
+                args = (func.__module__, func.__qualname__, hooks, self.params)
+                return _rebuild_loss, args
+
         defaults = argspecs.kwonlydefaults or {}
         _loss = Loss(**defaults)
         if register:
@@ -61,7 +137,19 @@ def loss(func: Optional[Callable] = None, *, register: Optional[bool] = False):
     return _decorator(func)
 
 
+def _rebuild_loss(module: str, qualname: str, hooks: Dict, params: Dict):
+    obj = import_module(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    if not isinstance(obj, BaseLoss):
+        obj = loss(obj, **hooks)
+    return obj._return_with_params(**params)
+
+
 class BaseLoss(ABC):
+    # N times the loss equals this factor times the negative log likelihood.
+    likelihood_factor = 2.0
+
     def __init__(self, name, **params):
         self.name = name
         self.params = params
@@ -70,9 +158,42 @@ class BaseLoss(ABC):
         self.params.update(kwargs)
         return self
 
+    @property
+    def has_gradient(self) -> bool:
+        return False
+
     def function(self, y_true, y_est, weights, sigma):
         raise NotImplementedError
 
+    def gradient_function(self, y_true, y_est, weights, sigma):
+        raise NotImplementedError(f"Loss {self.name} has no gradient.")
+
+    def gradient(self, y_true, y_est, weights, sigma):
+        """Derivative of the loss with respect to `y_est`."""
+        return self.gradient_function(y_true, y_est, weights, sigma, **self.params)
+
+    def bind(self) -> Callable:
+        """Returns the loss as a plain function of (y_true, y_est, weights, sigma) with
+        its parameters bound, without the argument handling of `__call__`."""
+        return partial(self.function, **self.params)
+
+    def bind_gradient(self) -> Callable:
+        """Returns the gradient as a plain function of (y_true, y_est, weights, sigma)
+        with the parameters of the loss bound."""
+        return partial(self.gradient_function, **self.params)
+
+    def prepare(self, y_true, weights, sigma) -> Callable:
+        """Returns the loss as a function of `y_est` for fixed `y_true`, `weights` and
+        `sigma`, with everything that only depends on those precomputed."""
+        function = self.bind()
+        return lambda y_est: function(y_true, y_est, weights, sigma)
+
+    def prepare_gradient(self, y_true, weights, sigma) -> Callable:
+        """Returns the gradient as a function of `y_est` for fixed `y_true`, `weights`
+        and `sigma`."""
+        gradient = self.bind_gradient()
+        return lambda y_est: gradient(y_true, y_est, weights, sigma)
+
     def __call__(self, y_true=None, y_est=None, weights=None, sigma=None, **kwargs):
         if y_true is None and y_est is None and weights is None and sigma is None:
             return self._return_with_params(**kwargs)
@@ -83,16 +204,94 @@ class BaseLoss(ABC):
         return f"<loss {self.name}(y_true, y_est, weights, sigma{params_repr})>"
 
 
-@loss(register=True)
+def _chi_squared_gradient(y_true, y_est, weights, sigma):
+    return -2.0 * weights * (y_true - y_est) / sigma**2 / np.size(y_est)
+
+
+def _prepare_chi_squared(y_true, weights, sigma):
+    y_true, weights, sigma = np.asarray(y_true), np.asarray(weights), np.asarray(sigma)
+    inverse_variance = weights / sigma**2 / np.size(y_true)
+
+    def _chi_squared(y_est):
+        residuals = y_true - y_est
+        residuals *= residuals
+        residuals *= inverse_variance
+        return residuals.sum()
+
+    return _chi_squared
+
+
+def _prepare_chi_squared_gradient(y_true, weights, sigma):
+    y_true, weights, sigma = np.asarray(y_true), np.asarray(weights), np.asarray(sigma)
+    inverse_variance = -2.0 * weights / sigma**2 / np.size(y_true)
+
+    def _chi_squared_gradient(y_est):
+        residuals = y_true - y_est
+        residuals *= inverse_variance
+        return residuals
+
+    return _chi_squared_gradient
+
+
+@loss(
+    register=True,
+    gradient=_chi_squared_gradient,
+    prepare=_prepare_chi_squared,
+    prepare_gradient=_prepare_chi_squared_gradient,
+)
 def chi_squared(y_true, y_est, weights, sigma):
     return np.mean(weights * (y_true - y_est) ** 2 / sigma**2)
 
 
-@loss(register=True)
+def _laplace_gradient(y_true, y_est, weights, sigma):
+    return -weights * np.sign(y_true - y_est) / sigma / np.size(y_est)
+
+
+def _prepare_laplace(y_true, weights, sigma):
+    y_true, weights, sigma = np.asarray(y_true), np.asarray(weights), np.asarray(sigma)
+    inverse_sigma = weights / sigma / np.size(y_true)
+
+    def _laplace(y_est):
+        residuals = y_true - y_est
+        np.abs(residuals, out=residuals)
+        residuals *= inverse_sigma
+        return residuals.sum()
+
+    return _laplace
+
+
+@loss(
+    register=True,
+    gradient=_laplace_gradient,
+    prepare=_prepare_laplace,
+    likelihood_factor=1.0,
+)
 def laplace(y_true, y_est, weights, sigma):
     return np.mean(weights * np.abs(y_true - y_est) / sigma)
 
 
-@loss(register=True)
+def _poisson_gradient(y_true, y_est, weights, sigma, *, epsilon: float = 1e-8):
+    return weights * (1.0 - y_true / (y_est + epsilon)) / np.size(y_est)
+
+
+def _prepare_poisson(y_true, weights, sigma, *, epsilon: float = 1e-8):
+    y_true, weights = np.asarray(y_true), np.asarray(weights)
+    normalized_weights = weights / np.size(y_true)
+    weighted_y_true = normalized_weights * y_true
+
+    def _poisson(y_est):
+        log_y_est = y_est + epsilon
+        np.log(log_y_est, out=log_y_est)
+        return np.vdot(normalized_weights, y_est) - np.vdot(weighted_y_true, log_y_est)
+
+    return _poisson
+
+
+@loss(
+    register=True,
+    gradient=_poisson_gradient,
+    prepare=_prepare_poisson,
+    likelihood_factor=1.0,
+)
 def poisson(y_true, y_est, weights, sigma, *, epsilon: float = 1e-8):
     return np.mean(weights * (y_est - y_true * np.log(y_est + epsilon)))
@@ -0,0 +1,22 @@
+import numpy as np
+from optimazing._cache import EvaluationCache
+
+
+def test_evaluation_cache():
+    calls = []
+
+    def function(p):
+        calls.append(p.copy())
+        return p.sum(), 2 * p
+
+    cache = EvaluationCache(2)
+    cached = cache.wrap(function)
+    p, q, r = np.array([1.0, 2.0]), np.array([3.0, 4.0]), np.array([5.0, 6.0])
+    value, jac = cached(p)
+    jac[0] = 100.0
+    assert cached(p)[1][0] == 2.0
+    cached(q)
+    cached(r)
+    cached(p)
+    assert len(calls) == 4
+    assert cache.hits == 1 and cache.misses == 4
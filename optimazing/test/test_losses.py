@@ -1,5 +1,6 @@
+import pickle
 import numpy as np
-from optimazing import losses
+from optimazing import losses, loss
 import pytest
 
 
@@ -10,3 +11,57 @@ def test_losses(loss):
         rnd.rand(10), rnd.rand(10), rnd.rand(10), rnd.rand(10)
     )
     assert isinstance(evaluated_loss, float)
+
+
+@pytest.mark.parametrize("loss", losses)
+def test_loss_gradients(loss):
+    rnd = np.random.RandomState(0)
+    y_true, y_est, weights, sigma = rnd.rand(4, 10) + 0.5
+    gradient = losses[loss].gradient(y_true, y_est, weights, sigma)
+    eps = 1e-6
+    numerical = np.array(
+        [
+            (
+                losses[loss](y_true, y_est + eps * e, weights, sigma)
+                - losses[loss](y_true, y_est - eps * e, weights, sigma)
+            )
+            / (2 * eps)
+            for e in np.eye(10)
+        ]
+    )
+    np.testing.assert_allclose(gradient, numerical, rtol=1e-5)
+
+
+@pytest.mark.parametrize("loss", losses)
+def test_losses_pickle(loss):
+    unpickled = pickle.loads(pickle.dumps(losses[loss]))
+    assert unpickled.name == losses[loss].name
+    assert unpickled.params == losses[loss].params
+    assert unpickled.likelihood_factor == losses[loss].likelihood_factor
+
+
+@pytest.mark.parametrize("loss", losses)
+def test_prepared_losses(loss):
+    rnd = np.random.RandomState(0)
+    y_true, y_est, weights, sigma = rnd.rand(4, 10) + 0.5
+    prepared = losses[loss].prepare(y_true, weights, sigma)
+    np.testing.assert_allclose(
+        prepared(y_est), losses[loss](y_true, y_est, weights, sigma)
+    )
+    prepared_gradient = losses[loss].prepare_gradient(y_true, weights, sigma)
+    np.testing.assert_allclose(
+        prepared_gradient(y_est), losses[loss].gradient(y_true, y_est, weights, sigma)
+    )
+
+
+def test_custom_prepare():
+    def _prepare_mse(y_true, weights, sigma, *, scale=1.0):
+        return lambda y_est: scale * np.mean((y_true - y_est) ** 2)
+
+    @loss(prepare=_prepare_mse)
+    def mse(y_true, y_est, weights, sigma, *, scale=1.0):
+        return scale * np.mean((y_true - y_est) ** 2)
+
+    y_true = np.arange(4.0)
+    assert mse.prepare(y_true, None, None)(y_true + 1) == 1.0
+    assert mse(scale=2.0).prepare(y_true, None, None)(y_true + 1) == 2.0
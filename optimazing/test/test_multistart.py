@@ -0,0 +1,20 @@
+import numpy as np
+from optimazing._multistart import sample_starts, distinct_minima
+
+
+def test_sample_starts():
+    x0 = np.array([0.5, 10.0, 1.0])
+    lower = np.array([0.0, -np.inf, 0.0])
+    upper = np.array([1.0, np.inf, np.inf])
+    starts = sample_starts(x0, 9, lower, upper, seed=0)
+
+    assert starts.shape == (9, 3)
+    np.testing.assert_array_equal(starts[0], x0)
+    assert np.all((starts[:, 0] >= 0.0) & (starts[:, 0] <= 1.0))
+    assert np.all((starts[:, 1] >= 0.0) & (starts[:, 1] <= 20.0))
+    assert np.all((starts[:, 2] >= 0.0) & (starts[:, 2] <= 2.0))
+
+
+def test_distinct_minima():
+    xs = [np.array([1.0, 2.0]), np.array([1.0, 2.00001]), np.array([3.0, 2.0])]
+    assert distinct_minima(xs, np.array([0.5, 0.4, 0.1])) == [2, 1]
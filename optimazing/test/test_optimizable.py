@@ -28,3 +28,17 @@ def test_optimizable_raise_when_no_args():
         @optimizable
         def linear(*, x, a, b):
             return a * x + b
+
+
+def test_optimizable_with_gradient():
+    def linear_gradient(x, *, a, b):
+        return {"a": x, "b": 1.0}
+
+    @optimizable(gradient=linear_gradient)
+    def linear(x, *, a, b):
+        return a * x + b
+
+    assert isinstance(linear, OptimizableFunction)
+    assert linear.has_gradient
+    assert linear.freeze(b=0.0).has_gradient
+    assert linear.bound(a=(0.0, None)).has_gradient
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from optimazing import OptimizableFunction
+from optimazing import OptimizableFunction, TraceRecorder
 import pytest
 from scipy.optimize import minimize
 
@@ -115,8 +115,850 @@ def test_frozen_fit(data, a_freeze, b_freeze):
         np.testing.assert_almost_equal(result.b.value, exp.x[0], decimal=7)
 
 
+def test_method_keyword_parameter_names(data):
+    x, y = data
+
+    def linear_seed(x, *, seed, tol):
+        return seed * x + tol
+
+    optfun = OptimizableFunction(linear_seed)
+    result = optfun.fit(x, y, seed=1.0, tol=0.0)
+    exp = OptimizableFunction(linear).fit(x, y, a=1.0, b=0.0)
+    np.testing.assert_almost_equal(result.seed.value, exp.a.value, decimal=5)
+    with pytest.raises(ValueError):
+        optfun.fit_multistart(x, y, seed=1.0, tol=0.0)
+    with pytest.raises(ValueError):
+        optfun.fit_stochastic([(x, y)], seed=1.0, tol=0.0)
+    optfun.freeze(seed=1.0).fit_multistart(x, y, n_starts=2, tol=0.0)
+
+
 def test_raises_when_all_frozen(data):
     x, y = data
     optfun = OptimizableFunction(linear).freeze(a=1.0, b=1.0)
     with pytest.raises(ValueError):
         optfun.fit(x, y)
+
+
+def linear_gradient(x, *, a, b):
+    return {"a": x, "b": 1.0}
+
+
+def polynomial(x, *, c):
+    return np.polyval(c, x)
+
+
+def polynomial_gradient(x, *, c):
+    return {"c": x[None] ** np.arange(len(c))[::-1, None]}
+
+
+@pytest.mark.parametrize("loss", ["chi_squared", "laplace"])
+def test_fit_with_gradient(data, loss):
+    x, y = data
+    calls = []
+
+    def counting_linear(x, *, a, b):
+        calls.append(1)
+        return a * x + b
+
+    result = OptimizableFunction(linear).fit(x, y, loss=loss, a=1.0, b=1.0)
+    optfun = OptimizableFunction(counting_linear, gradient=linear_gradient)
+    grad_result = optfun.fit(x, y, loss=loss, a=1.0, b=1.0)
+
+    assert grad_result.result.njev > 0
+    assert len(calls) == grad_result.result.nfev
+    np.testing.assert_almost_equal(grad_result.a.value, result.a.value, decimal=4)
+    np.testing.assert_almost_equal(grad_result.b.value, result.b.value, decimal=4)
+
+
+def test_fit_with_gradient_array_parameter(data):
+    x, y = data
+    optfun = OptimizableFunction(polynomial, gradient=polynomial_gradient)
+    result = optfun.fit(x, y, c=np.zeros(3))
+    np.testing.assert_allclose(result.c.value, np.polyfit(x, y, 2), atol=1e-5)
+
+
+@pytest.mark.parametrize("gradient", [None, linear_gradient])
+def test_least_squares_fit(data, gradient):
+    x, y = data
+    sigma = np.linspace(0.5, 1.5, len(x))
+    optfun = OptimizableFunction(linear, gradient=gradient)
+    result = optfun.fit(x, y, sigma=sigma, solver="least_squares", a=1.0, b=1.0)
+    exp = optfun.fit(x, y, sigma=sigma, a=1.0, b=1.0)
+
+    np.testing.assert_almost_equal(result.a.value, exp.a.value, decimal=5)
+    np.testing.assert_almost_equal(result.b.value, exp.b.value, decimal=5)
+    np.testing.assert_almost_equal(result._function_value, exp.result.fun)
+    np.testing.assert_allclose(result.a.uncertainty, exp.a.uncertainty, rtol=5e-2)
+
+
+def test_bounded_least_squares_fit(data):
+    x, y = data
+    optfun = OptimizableFunction(linear).bound(a=(None, 2.0))
+    result = optfun.fit(x, y, solver="least_squares", a=1.0, b=1.0)
+    np.testing.assert_almost_equal(result.a.value, 2.0)
+
+
+def test_least_squares_raises_for_other_losses(data):
+    x, y = data
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).fit(
+            x, y, loss="laplace", solver="least_squares", a=1.0, b=1.0
+        )
+
+
+def test_fit_many(data):
+    x, y = data
+    rnd = np.random.RandomState(1)
+    datasets = [(x, y + rnd.randn(len(x)) * 0.1) for _ in range(5)]
+    datasets.append((pd.DataFrame({"x": x, "y": y}), "y"))
+    optfun = OptimizableFunction(linear).freeze(b=1.0)
+    results = optfun.fit_many(datasets, a=1.0)
+
+    assert len(results) == 6
+    assert results.a.value.shape == (6,)
+    assert results.a.uncertainty.shape == (6,)
+    np.testing.assert_array_equal(results.b.value, np.ones(6))
+    assert results.success.all()
+    for (args, target), result in zip(datasets, results):
+        exp = optfun.fit(args, target, a=1.0)
+        np.testing.assert_almost_equal(result.a.value, exp.a.value)
+        np.testing.assert_almost_equal(result._function_value, exp.result.fun)
+        np.testing.assert_allclose(result.covariance, exp.covariance, rtol=1e-4)
+        np.testing.assert_allclose(
+            result(x, uncertainty=True), exp(x, uncertainty=True), rtol=1e-4
+        )
+
+
+def test_fit_many_raises_for_invalid_dataset(data):
+    x, y = data
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).fit_many([(x, y, None, None, None)], a=1, b=1)
+
+
+@pytest.mark.parametrize("chunksize", [1, 4])
+def test_fit_many_parallel(data, chunksize):
+    x, y = data
+    rnd = np.random.RandomState(1)
+    datasets = [(x, y + rnd.randn(len(x)) * 0.1) for _ in range(10)]
+    optfun = OptimizableFunction(linear)
+    results = optfun.fit_many(datasets, a=1.0, b=1.0)
+    parallel_results = optfun.fit_many(
+        iter(datasets), n_jobs=2, chunksize=chunksize, a=1.0, b=1.0
+    )
+    np.testing.assert_allclose(parallel_results.a.value, results.a.value)
+    np.testing.assert_allclose(parallel_results.b.value, results.b.value)
+    np.testing.assert_allclose(
+        parallel_results.function_values, results.function_values
+    )
+
+
+def test_fit_groups(data):
+    x, y = data
+    rnd = np.random.RandomState(1)
+    df = pd.DataFrame(
+        {
+            "x": np.tile(x, 3),
+            "y": np.concatenate([y, 2 * y, 3 * y]),
+            "sigma": rnd.rand(3 * len(x)) + 0.5,
+            "channel": np.repeat(["c", "a", "b"], len(x)),
+        }
+    ).sample(frac=1.0, random_state=0)
+    optfun = OptimizableFunction(linear)
+    result = optfun.fit_groups(df, by="channel", target="y", sigma="sigma", a=1, b=1)
+
+    assert list(result.index) == ["a", "b", "c"]
+    assert list(result.columns) == [
+        "a",
+        "a_uncertainty",
+        "b",
+        "b_uncertainty",
+        "loss",
+        "success",
+    ]
+    for channel, group in df.groupby("channel"):
+        exp = optfun.fit(group, "y", sigma="sigma", a=1, b=1)
+        np.testing.assert_almost_equal(result.loc[channel, "a"], exp.a.value)
+        np.testing.assert_almost_equal(result.loc[channel, "loss"], exp.result.fun)
+
+
+def test_fit_groups_missing_keys(data):
+    x, y = data
+    channel = np.where(np.arange(len(x)) % 2 == 0, "a", "b").astype(object)
+    channel[::5] = None
+    df = pd.DataFrame({"x": x, "y": y, "channel": channel})
+    optfun = OptimizableFunction(linear)
+    result = optfun.fit_groups(df, by="channel", target="y", a=1, b=1)
+
+    assert list(result.index) == ["a", "b"]
+    for key, group in df.dropna().groupby("channel"):
+        exp = optfun.fit(group, "y", a=1, b=1)
+        np.testing.assert_almost_equal(result.loc[key, "a"], exp.a.value)
+
+
+def test_fit_groups_raises_for_missing_columns(data):
+    x, y = data
+    df = pd.DataFrame({"x": x, "y": y, "channel": 0})
+    with pytest.raises(KeyError):
+        OptimizableFunction(linear).fit_groups(df, "channel", "z", a=1, b=1)
+
+
+def exponential(x, *, a, tau):
+    return a * np.exp(-x / tau)
+
+
+@pytest.mark.parametrize("gradient", [None, linear_gradient])
+def test_fit_stacked(data, gradient):
+    x, y = data
+    rnd = np.random.RandomState(1)
+    targets = y + rnd.randn(20, len(x)) * 0.1
+    sigma = rnd.rand(20, len(x)) + 0.5
+    optfun = OptimizableFunction(linear, gradient=gradient)
+    results = optfun.fit_stacked(np.tile(x, (20, 1)), targets, sigma=sigma, a=0, b=0)
+    exp = optfun.fit_many(
+        [(x, t, None, s) for t, s in zip(targets, sigma)],
+        solver="least_squares",
+        a=0.0,
+        b=0.0,
+    )
+    assert results.success.all()
+    np.testing.assert_allclose(results.a.value, exp.a.value, rtol=1e-6)
+    np.testing.assert_allclose(results.b.value, exp.b.value, rtol=1e-6)
+    np.testing.assert_allclose(results.a.uncertainty, exp.a.uncertainty, rtol=1e-4)
+    np.testing.assert_allclose(results.function_values, exp.function_values)
+    np.testing.assert_allclose(
+        results[0](x, uncertainty=True), exp[0](x, uncertainty=True), rtol=1e-4
+    )
+
+
+def test_fit_stacked_nonlinear():
+    x = np.linspace(0.0, 5.0, 32)
+    a, tau = np.array([1.0, 2.0, 3.0]), np.array([0.5, 1.0, 2.0])
+    targets = a[:, None] * np.exp(-x / tau[:, None])
+    optfun = OptimizableFunction(exponential).freeze(a=a[:, None])
+    results = optfun.fit_stacked(np.tile(x, (3, 1)), targets, tau=1.0)
+    np.testing.assert_allclose(results.tau.value, tau, rtol=1e-6)
+
+
+def test_fit_stacked_raises_when_bounded(data):
+    x, y = data
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).bound(a=(0, 1)).fit_stacked([x], [y], a=1, b=1)
+
+
+def exponential_with_offset(x, *, a, b, tau):
+    return a * np.exp(-x / tau) + b
+
+
+@pytest.mark.parametrize("solver", ["minimize", "least_squares"])
+def test_fit_linear_parameters(solver):
+    x = np.linspace(0.0, 5.0, 32)
+    y = 2.0 * np.exp(-x / 1.5) + 0.5
+    y += np.random.RandomState(0).randn(32) * 0.01
+    optfun = OptimizableFunction(exponential_with_offset, linear=["a", "b"])
+    result = optfun.fit(x, y, solver=solver, a=1.0, b=0.0, tau=1.0)
+    exp = OptimizableFunction(exponential_with_offset).fit(
+        x, y, solver="least_squares", a=1.0, b=0.0, tau=1.0
+    )
+    assert optfun.is_partially_linear
+    for p in ["a", "b", "tau"]:
+        np.testing.assert_allclose(
+            getattr(result, p).value, getattr(exp, p).value, rtol=1e-4
+        )
+        np.testing.assert_allclose(
+            getattr(result, p).uncertainty, getattr(exp, p).uncertainty, rtol=1e-3
+        )
+    np.testing.assert_almost_equal(result._function_value, exp._function_value)
+
+
+def test_fit_all_linear_parameters(data):
+    x, y = data
+    sigma = np.linspace(0.5, 1.5, len(x))
+    optfun = OptimizableFunction(linear, linear=["a", "b"])
+    result = optfun.fit(x, y, sigma=sigma, a=0.0, b=0.0)
+    exp = np.polyfit(x, y, 1, w=1 / sigma)
+    assert result.result.nit == 0
+    np.testing.assert_allclose(result.a.value, exp[0])
+    np.testing.assert_allclose(result.b.value, exp[1])
+
+
+def test_fit_linear_parameters_raises(data):
+    x, y = data
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear, linear=["c"])
+    optfun = OptimizableFunction(linear, linear=["a"])
+    with pytest.raises(ValueError):
+        optfun.fit(x, y, loss="laplace", a=1.0, b=1.0)
+    with pytest.raises(ValueError):
+        optfun.bound(a=(0.0, 1.0)).fit(x, y, a=1.0, b=1.0)
+
+
+def test_linear_solver(data):
+    x, y = data
+    sigma = np.linspace(0.5, 1.5, len(x))
+    result = OptimizableFunction(linear).fit(
+        x, y, sigma=sigma, solver="linear", a=0.0, b=0.0
+    )
+    exp = OptimizableFunction(linear).fit(
+        x, y, sigma=sigma, solver="least_squares", a=0.0, b=0.0
+    )
+    np.testing.assert_allclose(result.a.value, exp.a.value)
+    np.testing.assert_allclose(result.b.value, exp.b.value)
+    np.testing.assert_allclose(result.a.uncertainty, exp.a.uncertainty)
+    np.testing.assert_allclose(result.b.uncertainty, exp.b.uncertainty)
+    np.testing.assert_almost_equal(result._function_value, exp._function_value)
+
+
+def test_linear_solver_array_parameter(data):
+    x, y = data
+    result = OptimizableFunction(polynomial).fit(x, y, solver="linear", c=np.zeros(3))
+    np.testing.assert_allclose(result.c.value, np.polyfit(x, y, 2))
+
+
+def test_linear_solver_raises_for_nonlinear_function(data):
+    x, y = data
+
+    def squared_slope(x, *, a):
+        return a**2 * x
+
+    with pytest.raises(ValueError):
+        OptimizableFunction(squared_slope).fit(x, y, solver="linear", a=1.0)
+
+
+@pytest.mark.parametrize("solver", ["minimize", "least_squares"])
+def test_fit_with_cache(data, solver):
+    x, y = data
+    calls = []
+
+    def counting_linear(x, *, a, b):
+        calls.append((a, b))
+        return a * x + b
+
+    optfun = OptimizableFunction(counting_linear)
+    result = optfun.fit(x, y, solver=solver, a=1.0, b=1.0)
+    num_calls = len(calls)
+    calls.clear()
+    cached_result = optfun.fit(x, y, solver=solver, cache_size=8, a=1.0, b=1.0)
+
+    assert len(calls) == len(set(calls))
+    assert len(calls) <= num_calls
+    assert cached_result.a.value == result.a.value
+    assert cached_result.b.value == result.b.value
+
+
+@pytest.mark.parametrize(
+    "options", [{"method": "L-BFGS-B"}, {"method": "Nelder-Mead"}, {"method": "Powell"}]
+)
+def test_uncertainties_without_optimizer_hessian(data, options):
+    x, y = data
+    optfun = OptimizableFunction(linear)
+    exp = optfun.fit(x, y, solver="linear", a=1.0, b=1.0)
+    result = optfun.fit(x, y, options=options, a=1.0, b=1.0)
+    bounded = optfun.bound(a=(0.0, 10.0)).fit(x, y, options=options, a=1.0, b=1.0)
+
+    for r in [result, bounded]:
+        np.testing.assert_allclose(r.a.uncertainty, exp.a.uncertainty, rtol=1e-3)
+        np.testing.assert_allclose(r.b.uncertainty, exp.b.uncertainty, rtol=1e-3)
+
+
+@pytest.mark.parametrize("uncertainty", ["hessian", "jacobian"])
+def test_uncertainty_methods(data, uncertainty):
+    x, y = data
+    optfun = OptimizableFunction(linear)
+    exp = optfun.fit(x, y, solver="linear", a=1.0, b=1.0)
+    result = optfun.fit(x, y, uncertainty=uncertainty, a=1.0, b=1.0)
+
+    np.testing.assert_allclose(result.a.uncertainty, exp.a.uncertainty, rtol=1e-4)
+    np.testing.assert_allclose(result.b.uncertainty, exp.b.uncertainty, rtol=1e-4)
+
+
+def test_uncertainties_vectorized(data):
+    x, y = data
+    calls = []
+
+    def counting_exponential(x, *, a, tau):
+        calls.append(np.shape(a))
+        return a * np.exp(-x / tau)
+
+    exp = OptimizableFunction(counting_exponential).fit(
+        x, y, uncertainty="hessian", a=1.0, tau=1.0
+    )
+    calls.clear()
+    optfun = OptimizableFunction(counting_exponential, vectorized=True)
+    result = optfun.fit(x, y, uncertainty="hessian", a=1.0, tau=1.0)
+
+    assert calls.count((9, 1)) == 1
+    np.testing.assert_allclose(result.a.uncertainty, exp.a.uncertainty)
+    np.testing.assert_allclose(result.tau.uncertainty, exp.tau.uncertainty)
+
+
+def test_uncertainty_raises(data):
+    x, y = data
+    optfun = OptimizableFunction(linear)
+    with pytest.raises(ValueError):
+        optfun.fit(x, y, uncertainty="bootstrap", a=1.0, b=1.0)
+    with pytest.raises(ValueError):
+        optfun.fit(x, y, loss="laplace", uncertainty="jacobian", a=1.0, b=1.0)
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"gradient": linear_gradient}, {"vectorized": True}]
+)
+def test_fit_covariance(data, kwargs):
+    x, y = data
+    result = OptimizableFunction(linear, **kwargs).fit(
+        x, y, solver="least_squares", a=1.0, b=1.0
+    )
+    cov = result.covariance
+
+    assert cov.shape == (2, 2)
+    np.testing.assert_allclose(
+        np.sqrt(np.diag(cov)), [result.a.uncertainty, result.b.uncertainty]
+    )
+    np.testing.assert_allclose(
+        result.correlation[0, 1], cov[0, 1] / np.sqrt(cov[0, 0] * cov[1, 1])
+    )
+    assert result.covariance_of("a", "b") == cov[0, 1]
+
+    y_est, y_unc = result(x, uncertainty=True)
+    np.testing.assert_allclose(y_est, result(x))
+    np.testing.assert_allclose(
+        y_unc, np.sqrt(cov[0, 0] * x**2 + 2 * cov[0, 1] * x + cov[1, 1]), rtol=1e-5
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"solver": "least_squares"},
+        {"solver": "linear"},
+        {"uncertainty": "hessian"},
+        {"options": {"method": "Nelder-Mead"}},
+    ],
+)
+@pytest.mark.parametrize("num_points", [20, 2000])
+def test_fit_covariance_scale(kwargs, num_points):
+    x = np.linspace(0.0, 1.0, num_points)
+    y = 2 * x + 1 + np.random.RandomState(0).randn(num_points) * 0.1
+    sigma = np.full(num_points, 0.1)
+    design = np.stack([x, np.ones(num_points)], axis=1)
+    exp = np.linalg.inv(design.T @ design / 0.1**2)
+
+    result = OptimizableFunction(linear).fit(x, y, sigma=sigma, a=1.0, b=0.0, **kwargs)
+    np.testing.assert_allclose(result.covariance, exp, rtol=1e-5)
+    np.testing.assert_allclose(result.a.uncertainty, np.sqrt(exp[0, 0]), rtol=1e-5)
+    fit = OptimizableFunction(linear).fit_incremental(a=0.0, b=0.0)
+    np.testing.assert_allclose(fit.update(x, y, sigma=sigma).result.covariance, exp)
+
+
+@pytest.mark.parametrize(
+    "optimizer,options",
+    [
+        ["adam", {"learning_rate": 0.05}],
+        ["sgd", {"learning_rate": 0.05}],
+        ["lbfgs", {}],
+    ],
+)
+@pytest.mark.parametrize("gradient", [None, linear_gradient])
+def test_fit_stochastic(optimizer, options, gradient):
+    rnd = np.random.RandomState(0)
+    x = rnd.rand(10000)
+    y = 3 * x + 1 + rnd.randn(10000) * 0.1
+    df = pd.DataFrame({"x": x, "y": y})
+    optfun = OptimizableFunction(linear, gradient=gradient)
+    exp = optfun.fit(x, y, solver="linear", a=1.0, b=1.0)
+
+    def batches():
+        for rows in np.array_split(np.arange(len(df)), 20):
+            yield df.iloc[rows], "y"
+
+    result = optfun.fit_stochastic(
+        batches, optimizer=optimizer, epochs=50, tol=1e-4, options=options, a=0, b=0
+    )
+    assert result.result.success
+    assert result.a.uncertainty is None
+    np.testing.assert_allclose(result.a.value, exp.a.value, atol=1e-2)
+    np.testing.assert_allclose(result.b.value, exp.b.value, atol=1e-2)
+
+
+def test_fit_stochastic_lbfgs_ordered_batches():
+    # Batches sorted by x have very different optima, the fit has to find the optimum
+    # of the full data rather than that of the last batch.
+    x = np.linspace(0.0, 1.0, 200)
+    y = 2 * x + 1 + np.random.RandomState(0).randn(200) * 0.3
+    optfun = OptimizableFunction(linear)
+    exp = optfun.fit(x, y, solver="linear", a=0.0, b=0.0)
+    batches = [(x[rows], y[rows]) for rows in np.array_split(np.arange(200), 4)]
+
+    result = optfun.fit_stochastic(batches, optimizer="lbfgs", epochs=200, a=0, b=0)
+    np.testing.assert_allclose(result.a.value, exp.a.value, atol=2e-3)
+    np.testing.assert_allclose(result.b.value, exp.b.value, atol=2e-3)
+
+
+def test_fit_stochastic_bounded_and_exhausted(data):
+    x, y = data
+    optfun = OptimizableFunction(linear).bound(a=(None, 2.0))
+    result = optfun.fit_stochastic([(x, y)] * 10, epochs=5, a=1.0, b=1.0)
+    assert result.a.value <= 2.0
+    with pytest.raises(ValueError):
+        optfun.fit_stochastic(iter([(x, y)]), epochs=2, a=1.0, b=1.0)
+    with pytest.raises(ValueError):
+        optfun.fit_stochastic([(x, y)], optimizer="rmsprop", a=1.0, b=1.0)
+
+
+@pytest.mark.parametrize("loss", ["chi_squared", "poisson"])
+@pytest.mark.parametrize("gradient", [None, linear_gradient])
+def test_fit_chunked(data, loss, gradient):
+    x, y = data
+    weights = np.linspace(0.5, 1.5, len(x))
+    optfun = OptimizableFunction(linear, gradient=gradient)
+    exp = optfun.fit(x, y, loss=loss, weights=weights, a=1.0, b=1.0)
+    result = optfun.fit(x, y, loss=loss, weights=weights, chunk_size=5, a=1.0, b=1.0)
+
+    np.testing.assert_allclose(result.a.value, exp.a.value, rtol=1e-6)
+    np.testing.assert_allclose(result.b.value, exp.b.value, rtol=1e-6)
+    np.testing.assert_allclose(result._function_value, exp._function_value, rtol=1e-6)
+
+
+@pytest.mark.parametrize("uncertainty", ["jacobian", "hessian"])
+def test_fit_chunked_uncertainties(data, uncertainty):
+    x, y = data
+    sizes = []
+
+    def sized_linear(x, *, a, b):
+        sizes.append(len(x))
+        return a * x + b
+
+    optfun = OptimizableFunction(sized_linear).bound(a=(0.0, None))
+    exp = optfun.fit(x, y, uncertainty=uncertainty, a=1.0, b=1.0)
+    sizes.clear()
+    result = optfun.fit(x, y, uncertainty=uncertainty, chunk_size=5, a=1.0, b=1.0)
+
+    assert max(sizes) == 5
+    np.testing.assert_allclose(result.covariance, exp.covariance, rtol=1e-4)
+
+
+def test_fit_chunked_raises(data):
+    x, y = data
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).fit(
+            x, y, solver="least_squares", chunk_size=5, a=1.0, b=1.0
+        )
+    for chunk_size in [0, -5, 2.5]:
+        with pytest.raises(ValueError):
+            OptimizableFunction(linear).fit(x, y, chunk_size=chunk_size, a=1.0, b=1.0)
+
+
+def test_fit_npy_files(data, tmp_path):
+    x, y = data
+    np.save(tmp_path / "x.npy", x)
+    np.save(tmp_path / "y.npy", y)
+    optfun = OptimizableFunction(linear)
+    exp = optfun.fit(x, y, a=1.0, b=1.0)
+
+    result = optfun.fit(str(tmp_path / "x.npy"), tmp_path / "y.npy", a=1.0, b=1.0)
+    memmap = np.load(tmp_path / "x.npy", mmap_mode="r")
+    memmap_result = optfun.fit(memmap, y, a=1.0, b=1.0)
+
+    for r in [result, memmap_result]:
+        np.testing.assert_allclose(r.a.value, exp.a.value)
+        np.testing.assert_allclose(r.b.value, exp.b.value)
+
+
+def test_fit_arrow_and_parquet(data, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    x, y = data
+    table = pa.table({"x": x, "y": y, "unused": x})
+    pq.write_table(table, tmp_path / "data.parquet")
+    optfun = OptimizableFunction(linear)
+    exp = optfun.fit(x, y, a=1.0, b=1.0)
+
+    for source in [table, str(tmp_path / "data.parquet")]:
+        for target in ["y", y]:
+            result = optfun.fit(source, target, a=1.0, b=1.0)
+            np.testing.assert_allclose(result.a.value, exp.a.value)
+            np.testing.assert_allclose(result.b.value, exp.b.value)
+        result = optfun.fit(source, y, sigma=np.full(len(y), 0.5), a=1.0, b=1.0)
+        np.testing.assert_allclose(result.a.value, exp.a.value)
+
+
+def test_fit_dataframe_arguments_are_not_copied(data):
+    x, y = data
+    seen = {}
+
+    def plane(x, n, *, a, b):
+        seen.update(x=x, n=n)
+        return a * x + b * n
+
+    df = pd.DataFrame({"x": x, "n": np.arange(len(x)), "y": y})
+    result = OptimizableFunction(plane).fit(df, "y", a=1.0, b=1.0)
+
+    assert seen["n"].dtype == df["n"].dtype
+    assert np.shares_memory(seen["x"], df["x"].to_numpy(copy=False))
+    exp = OptimizableFunction(plane).fit([x, np.arange(len(x))], y, a=1.0, b=1.0)
+    np.testing.assert_allclose(result.a.value, exp.a.value)
+
+
+def wave(x, *, a, omega):
+    return a * np.sin(omega * x)
+
+
+@pytest.mark.parametrize("sampling,n_jobs", [["sobol", 1], ["lhs", 1], ["sobol", 2]])
+def test_fit_multistart(sampling, n_jobs):
+    rnd = np.random.RandomState(0)
+    x = np.linspace(0.0, 10.0, 200)
+    y = 2.0 * np.sin(3.3 * x) + rnd.randn(200) * 0.1
+    optfun = OptimizableFunction(wave).bound(omega=(0.1, 10.0))
+    local = optfun.fit(x, y, a=1.0, omega=1.0)
+    result = optfun.fit_multistart(
+        x, y, n_starts=32, sampling=sampling, seed=0, n_jobs=n_jobs, a=1.0, omega=1.0
+    )
+
+    assert local._function_value > 1.0
+    np.testing.assert_allclose(result.omega.value, 3.3, atol=1e-2)
+    assert result._function_value == result.ensemble.function_values[0]
+    assert np.all(np.diff(result.ensemble.function_values) >= 0)
+    assert len(result.ensemble) > 1
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_fit_bootstrap(n_jobs):
+    rnd = np.random.RandomState(0)
+    x = np.linspace(0.0, 1.0, 200)
+    y = 3 * x + 1 + rnd.randn(200) * 0.1
+    design = np.stack([x, np.ones_like(x)], axis=1)
+    residuals = y - design @ np.linalg.lstsq(design, y, rcond=None)[0]
+    exp = np.sqrt(
+        np.diag(residuals @ residuals / 198 * np.linalg.inv(design.T @ design))
+    )
+
+    result = OptimizableFunction(linear).fit_bootstrap(
+        x, y, n_resamples=200, seed=0, n_jobs=n_jobs, a=1.0, b=1.0
+    )
+
+    assert len(result.ensemble) == 200
+    assert result.covariance.shape == (2, 2)
+    np.testing.assert_allclose(
+        [result.a.uncertainty, result.b.uncertainty], exp, rtol=0.2
+    )
+    np.testing.assert_allclose(
+        np.sqrt(np.diag(result.covariance)),
+        [result.a.uncertainty, result.b.uncertainty],
+    )
+    for p in [result.a, result.b]:
+        assert p.interval[0] < p.value < p.interval[1]
+
+    # Bootstrap and inverse hessian estimate the same covariance.
+    fit = OptimizableFunction(linear).fit(x, y, sigma=0.1, a=1.0, b=1.0)
+    np.testing.assert_allclose(
+        [result.a.uncertainty, result.b.uncertainty],
+        [fit.a.uncertainty, fit.b.uncertainty],
+        rtol=0.2,
+    )
+    np.testing.assert_allclose(result.covariance, fit.covariance, rtol=0.3)
+
+
+def test_refit():
+    rnd = np.random.RandomState(0)
+    x = np.linspace(0.0, 2.0, 200)
+    optfun = OptimizableFunction(exponential)
+    result = optfun.fit(x, 2 * np.exp(-x / 0.5) + rnd.randn(200) * 0.05, a=1, tau=1)
+    y = 2.01 * np.exp(-x / 0.5) + rnd.randn(200) * 0.05
+
+    refitted = result.refit(x, y)
+    exp = optfun.fit(x, y, a=1.0, tau=1.0)
+    assert refitted.result.nfev < exp.result.nfev
+    np.testing.assert_allclose(refitted.a.value, exp.a.value, rtol=1e-5)
+    np.testing.assert_allclose(refitted.tau.value, exp.tau.value, rtol=1e-5)
+
+    df = pd.DataFrame({"x": x, "y": y})
+    chained = refitted.refit(df, "y", options={"method": "Nelder-Mead"})
+    np.testing.assert_allclose(chained.a.value, exp.a.value, rtol=1e-3)
+
+
+def test_refit_linear_parameters(data):
+    x, y = data
+    optfun = OptimizableFunction(exponential_with_offset, linear=["a", "b"])
+    result = optfun.fit(x, y, a=1.0, b=1.0, tau=1.0)
+    refitted = result.refit(x, y + 1.0)
+    np.testing.assert_allclose(refitted.b.value, result.b.value + 1.0, rtol=1e-4)
+
+
+@pytest.mark.parametrize("gradient", [None, linear_gradient])
+@pytest.mark.parametrize("chunk_size", [None, 5])
+def test_fit_stats(data, gradient, chunk_size):
+    x, y = data
+    optfun = OptimizableFunction(linear, gradient=gradient)
+    result = optfun.fit(x, y, chunk_size=chunk_size, a=0.0, b=0.0)
+    stats = result.stats
+    num_blocks = 1 if chunk_size is None else 4
+    assert stats.evaluations["model"] == num_blocks * result.result.nfev
+    assert stats.evaluations["loss"] == stats.evaluations["model"]
+    num_gradients = 0 if gradient is None else stats.evaluations["model"]
+    assert stats.evaluations["gradient"] == num_gradients
+    assert stats.evaluations["loss_gradient"] == num_gradients
+    assert all(t >= 0.0 for t in stats.times.values())
+    assert stats.times["prepare"] > 0.0
+    assert stats.times["solver"] >= stats.times["optimizer"] + stats.times["model"]
+
+    result = optfun.fit(x, y, solver="least_squares", a=0.0, b=0.0)
+    assert result.stats.evaluations["model"] >= result.result.nfev
+    assert result.stats.evaluations["loss"] == 0
+
+
+@pytest.mark.parametrize(
+    "solver, linear",
+    [
+        ("linear", None),
+        ("minimize", ["a", "b"]),
+        ("least_squares", ["a", "b"]),
+    ],
+)
+def test_fit_stats_linear(data, solver, linear):
+    x, y = data
+    calls = []
+
+    def counted(x, *, a, b, tau):
+        calls.append(len(x))
+        return exponential_with_offset(x, a=a, b=b, tau=tau)
+
+    optfun = OptimizableFunction(counted, linear=linear)
+    if solver == "linear":
+        optfun = optfun.freeze(tau=1.0)
+        result = optfun.fit(x, y, solver=solver, a=1.0, b=0.0)
+    else:
+        result = optfun.fit(x, y, solver=solver, a=1.0, b=0.0, tau=1.0)
+    stats = result.stats
+    # the uncertainties come from the solver, so every call is made by it
+    assert stats.evaluations["model"] == len(calls)
+    assert stats.times["model"] > 0.0
+    assert stats.times["solver"] >= stats.times["optimizer"] + stats.times["model"]
+
+
+@pytest.mark.parametrize("solver", ["minimize", "least_squares"])
+def test_fit_callback(data, solver):
+    x, y = data
+    calls = []
+    result = OptimizableFunction(linear).fit(
+        x,
+        y,
+        solver=solver,
+        callback=lambda params, loss, elapsed: calls.append((params, loss, elapsed)),
+        callback_every=2,
+        a=0.0,
+        b=0.0,
+    )
+    if solver == "minimize":
+        assert len(calls) == result.result.nit // 2
+    else:
+        # least_squares evaluates the residuals once per iteration, plus at x0
+        assert 0 < len(calls) <= result.result.nfev // 2
+    assert len(calls) < result.stats.evaluations["model"] // 2
+    params, loss, elapsed = calls[-1]
+    assert set(params) == {"a", "b"}
+    assert loss >= result._function_value
+    # accepted iterates never increase the loss, unlike the probes around them
+    assert all(later[1] <= earlier[1] for earlier, later in zip(calls, calls[1:]))
+    assert all(later[2] >= earlier[2] for earlier, later in zip(calls, calls[1:]))
+
+
+def test_fit_callback_tnc(data):
+    x, y = data
+    trace = TraceRecorder()
+    result = OptimizableFunction(linear).fit(
+        x, y, callback=trace, options={"method": "TNC"}, a=0.0, b=0.0
+    )
+    assert len(trace) == result.result.nit
+    np.testing.assert_allclose(trace.loss[-1], result._function_value, rtol=1e-4)
+
+
+def test_fit_callback_linear(data):
+    x, y = data
+    trace = TraceRecorder()
+    result = OptimizableFunction(linear).fit(
+        x, y, solver="linear", callback=trace, callback_every=5, a=0.0, b=0.0
+    )
+    assert len(trace) == 1
+    np.testing.assert_allclose(trace.parameters["a"], [result.a.value])
+    np.testing.assert_allclose(trace.loss, [result._function_value])
+
+
+def test_fit_trace_recorder(data):
+    x, y = data
+    trace = TraceRecorder(capacity=4)
+    result = OptimizableFunction(exponential_with_offset, linear=["a", "b"]).fit(
+        x, y, callback=trace, a=1.0, b=0.0, tau=1.0
+    )
+    assert len(trace) == min(4, trace.count)
+    assert list(trace.parameters) == ["tau"]
+    np.testing.assert_allclose(trace.parameters["tau"][-1], result.tau.value, rtol=1e-3)
+
+
+def test_fit_callback_raises(data):
+    x, y = data
+    with pytest.raises(TypeError):
+        OptimizableFunction(linear).fit(x, y, callback="print", a=0.0, b=0.0)
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).fit(
+            x, y, callback=print, callback_every=0, a=0.0, b=0.0
+        )
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).fit(
+            x, y, callback=print, options={"callback": print}, a=0.0, b=0.0
+        )
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).fit(
+            x,
+            y,
+            solver="least_squares",
+            callback=print,
+            options={"method": "lm"},
+            a=0.0,
+            b=0.0,
+        )
+
+
+def test_fit_incremental(data):
+    x, y = data
+    sigma = np.linspace(0.5, 1.5, len(x))
+    fit = OptimizableFunction(linear).fit_incremental(a=0.0, b=0.0)
+    for block in np.array_split(np.arange(len(x)), 4):
+        result = fit.update(x[block], y[block], sigma=sigma[block]).result
+    exp = OptimizableFunction(linear).fit(
+        x, y, sigma=sigma, solver="linear", a=0.0, b=0.0
+    )
+    assert fit.num_batches == 4
+    np.testing.assert_allclose(result.a.value, exp.a.value)
+    np.testing.assert_allclose(result.b.value, exp.b.value)
+    np.testing.assert_allclose(result.a.uncertainty, exp.a.uncertainty)
+    np.testing.assert_allclose(result.covariance, exp.covariance)
+    np.testing.assert_almost_equal(result._function_value, exp._function_value)
+
+
+def test_fit_incremental_forgetting(data):
+    x, y = data
+    fit = OptimizableFunction(polynomial).fit_incremental(forgetting=0.5, c=np.zeros(3))
+    fit.update(x, y)
+    result = fit.update(pd.DataFrame({"x": x, "y": 2 * y}), "y").result
+    weights = np.repeat([0.5, 1.0], len(x))
+    exp = np.polyfit(np.tile(x, 2), np.concatenate([y, 2 * y]), 2, w=np.sqrt(weights))
+    np.testing.assert_allclose(result.c.value, exp)
+    assert fit.num_points == 1.5 * len(x)
+
+
+def test_fit_incremental_raises(data):
+    x, y = data
+
+    def squared_slope(x, *, a):
+        return a**2 * x
+
+    fit = OptimizableFunction(squared_slope).fit_incremental(a=1.0)
+    with pytest.raises(ValueError):
+        fit.result
+    with pytest.raises(ValueError):
+        fit.update(x, y)
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).fit_incremental(forgetting=0.0, a=0.0, b=0.0)
+    with pytest.raises(ValueError):
+        OptimizableFunction(linear).bound(a=(0, 1)).fit_incremental(a=0.0, b=0.0)
@@ -1,5 +1,6 @@
 import numpy as np
-from optimazing import OptimizationResult
+from optimazing import OptimizationResult, OptimizationResults
+from optimazing._parameters import Parameters
 
 
 def linear(x, *, a, b):
@@ -20,3 +21,63 @@ def test_optimization_result_callable():
 def test_optimization_result_repr():
     result = OptimizationResult(linear, {"a": 1.0, "b": 1.0}, 0.0, {"a": 0.1, "b": 0.1})
     assert repr(result) == "<OptimizationResult linear(x; a=1.0±0.1, b=1.0±0.1)>"
+
+
+def test_optimization_results():
+    results = OptimizationResults(
+        linear,
+        {"a": np.array([1.0, 2.0]), "b": np.array([0.0, 1.0])},
+        np.array([0.5, 0.25]),
+        [None, None],
+        {"a": np.array([0.1, 0.2]), "b": np.array([np.nan, np.nan])},
+    )
+    assert len(results) == 2
+    np.testing.assert_array_equal(results.a.value, [1.0, 2.0])
+    assert results[1].a.value == 2.0
+    assert results[1].a.uncertainty == 0.2
+    assert results[1].b.uncertainty is None
+    assert results[1]._function_value == 0.25
+    assert np.allclose(results[1]([0, 1]), [1.0, 3.0])
+    assert repr(results) == "<OptimizationResults linear(x; a, b) x 2>"
+
+
+def test_optimization_results_to_frame():
+    results = OptimizationResults(
+        linear,
+        {"a": np.array([[1.0, 2.0], [3.0, 4.0]]), "b": np.array([0.0, 1.0])},
+        np.array([0.5, 0.25]),
+        [None, None],
+    )
+    df = results.to_frame(index=["first", "second"])
+    assert list(df.columns) == [
+        "a[0]",
+        "a[0]_uncertainty",
+        "a[1]",
+        "a[1]_uncertainty",
+        "b",
+        "b_uncertainty",
+        "loss",
+        "success",
+    ]
+    np.testing.assert_array_equal(df["a[1]"], [2.0, 4.0])
+    assert df.loc["second", "loss"] == 0.25
+    assert df["success"].all()
+
+
+def test_optimization_result_covariance():
+    def polynomial(x, *, c, d):
+        return np.polyval(c, x) + d
+
+    covariance = np.arange(9.0).reshape(3, 3) + np.eye(3)
+    result = OptimizationResult(
+        polynomial,
+        {"c": np.array([1.0, 0.0]), "d": 1.0},
+        0.0,
+        None,
+        covariance=covariance,
+        parameters=Parameters(c=(2,), d=()),
+    )
+    np.testing.assert_array_equal(result.covariance_of("c"), covariance[:2, :2])
+    np.testing.assert_array_equal(result.covariance_of("c", "d"), covariance[:2, 2])
+    np.testing.assert_array_equal(result.covariance_of("d"), covariance[2, 2])
+    np.testing.assert_allclose(np.diag(result.correlation), 1.0)
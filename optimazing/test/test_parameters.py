@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from optimazing._parameters import Parameters
+
+
+def test_parameters_roundtrip():
+    parameters = Parameters(a=(), c=(2, 3), b=())
+    flat = parameters.flatten(a=1.0, c=np.arange(6.0).reshape(2, 3), b=2.0)
+    np.testing.assert_array_equal(flat, [1.0, 0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 2.0])
+    assert parameters.size == 8
+
+    params = parameters.unflatten(flat)
+    assert isinstance(params["a"], float) and params["a"] == 1.0
+    assert params["b"] == 2.0
+    np.testing.assert_array_equal(params["c"], np.arange(6.0).reshape(2, 3))
+    assert np.shares_memory(params["c"], flat)
+
+
+def test_parameters_unflatten_into_dict():
+    parameters = Parameters(a=(), b=(2,))
+    out = {"frozen": 3.0}
+    assert parameters.unflatten(np.array([1.0, 2.0, 3.0]), out) is out
+    assert out["a"] == 1.0 and out["frozen"] == 3.0
+    np.testing.assert_array_equal(out["b"], [2.0, 3.0])
+
+
+def test_parameters_flatten_raises():
+    parameters = Parameters(a=(), b=(2,))
+    with pytest.raises(KeyError):
+        parameters.flatten(a=1.0)
+    with pytest.raises(KeyError):
+        parameters.flatten(a=1.0, b=[2.0, 3.0], c=4.0)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from scipy.optimize import OptimizeResult
+from optimazing import TraceRecorder
+from optimazing._parameters import Parameters
+from optimazing._trace import iteration_callback
+
+
+def test_trace_recorder_ring_buffer():
+    trace = TraceRecorder(capacity=3)
+    assert trace.trace.shape == (0, 2)
+    for i in range(5):
+        trace({"a": float(i), "c": np.array([i, -i])}, loss=i**2, elapsed=0.1 * i)
+
+    assert trace.count == 5
+    assert len(trace) == 3
+    np.testing.assert_allclose(trace.loss, [4.0, 9.0, 16.0])
+    np.testing.assert_allclose(trace.elapsed, [0.2, 0.3, 0.4])
+    np.testing.assert_allclose(trace.parameters["a"], [2.0, 3.0, 4.0])
+    np.testing.assert_allclose(trace.parameters["c"], [[2, -2], [3, -3], [4, -4]])
+    assert list(trace.to_frame().columns) == ["elapsed", "loss", "a", "c[0]", "c[1]"]
+
+    trace.clear()
+    assert len(trace) == 0
+
+
+def test_trace_recorder_raises():
+    with pytest.raises(ValueError):
+        TraceRecorder(capacity=0)
+
+
+def test_iteration_callback():
+    calls = []
+    callback = iteration_callback(
+        Parameters(a=(), b=()),
+        lambda params, loss, elapsed: calls.append((params, loss)),
+        every=2,
+        loss_at=lambda p: np.sum(p**2),
+    )
+    for i in range(5):
+        callback(OptimizeResult(x=np.array([i, 1.0]), fun=float(i)))
+    callback(np.array([3.0, 1.0]))
+    callback(OptimizeResult(x=np.array([0.0, 0.0]), fun=np.ones(4), cost=4.0))
+    callback(OptimizeResult(x=np.array([0.0, 0.0]), fun=np.ones(4), cost=4.0))
+
+    assert [loss for _, loss in calls] == [1.0, 3.0, 10.0, 2.0]
+    assert calls[0][0] == {"a": 1.0, "b": 1.0}
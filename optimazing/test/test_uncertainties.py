@@ -0,0 +1,19 @@
+import numpy as np
+from optimazing._uncertainties import numerical_hessian, inverse_hessian
+
+
+def test_numerical_hessian():
+    hessian = np.array([[3.0, 1.0, 0.5], [1.0, 2.0, 0.0], [0.5, 0.0, 4.0]])
+    x = np.array([0.3, -2.0, 10.0])
+
+    def objective(points):
+        return 0.5 * np.einsum("mi,ij,mj->m", points, hessian, points)
+
+    np.testing.assert_allclose(numerical_hessian(objective, x), hessian, rtol=1e-4)
+
+
+def test_inverse_hessian():
+    np.testing.assert_allclose(
+        inverse_hessian(np.diag([4.0, 2.0])), np.diag([0.25, 0.5])
+    )
+    assert np.isnan(inverse_hessian(np.diag([4.0, -2.0]))[1, 1])
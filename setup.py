@@ -11,6 +11,7 @@ setup(
     keywords=["Optimization", "Scipy", "Minimization"],
     packages=["optimazing"],
     install_requires=["scipy", "numpy", "pandas"],
+    extras_require={"parquet": ["pyarrow"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",